@@ -8,28 +8,65 @@ load_dotenv()
 
 from flask import Flask, jsonify, render_template, request
 from flask_socketio import SocketIO, join_room, leave_room, emit
-from flask_jwt_extended import JWTManager, decode_token
+from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from src.api.json_provider import ORJSONProvider
+from src.api.middlewares import token_cache
+from src.api.socket_payloads import MessagePayload, RoomPayload, payload_error
+from pydantic import ValidationError
 from src.api.routes.auth_routes import auth_bp
 from src.api.routes.community_routes import community_bp
 from src.api.routes.message_routes import message_bp
 from src.api.routes.match_routes import match_bp
-from src.db.connection import db_session, init_db
-from src.db.models.community_member import CommunityMember
+from src.db.connection import db_session, init_db, register_db
 from src.db.models.user import User
 from src.services.message_service import MessageService
 from src.services.community_service import CommunityService
+from src.services.chat_cache_service import ChatCacheService
+from src.services.ai_stats_service import get_gemini_client
 from src.api.routes.news_routes import news_bp
 from src.api.routes.sticker_routes import sticker_bp
 from src.services.news_service import NewsService
+from src.services.match_service import MatchService
 from src.api.routes.rivalry_routes import rivalry_bp
 from src.api.routes.transfer_routes import transfer_bp
 from src.db.models.new_models import RivalryRoom, RivalryMessage, PredictionPoll, UserPrediction
 
 from apscheduler.schedulers.background import BackgroundScheduler
-from google import genai
+from cachetools import TTLCache
+import msgpack
+import queue
 import threading
+import time
+import zlib
 import atexit
+from collections import deque
+import logging
+import logging.handlers
+
+_LOG_LEVELS = ("CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG")
+
+def _configure_logging():
+    """
+    Route all log records through a queue so callers never block on stdout.
+    Level defaults to WARNING; set LOG_LEVEL=DEBUG to see per-event logs.
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    level = os.getenv("LOG_LEVEL", "WARNING").upper()
+    root.setLevel(level if level in _LOG_LEVELS else logging.WARNING)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    if level not in _LOG_LEVELS:
+        root.warning("Unknown LOG_LEVEL %r, using WARNING (expected one of %s)", level, ", ".join(_LOG_LEVELS))
+
+_configure_logging()
+logger = logging.getLogger(__name__)
 
 
 def _get_cors_origins():
@@ -53,6 +90,7 @@ def _get_cors_origins():
 CORS_ORIGINS = _get_cors_origins()
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # Configuration
 app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
@@ -61,12 +99,15 @@ app.config["DEBUG"] = os.getenv("FLASK_DEBUG", "1") == "1"
 
 # JWT Security Settings
 from datetime import timedelta
+# Symmetric HMAC signing: the secret is used as-is, with no key object to load per token
+app.config["JWT_ALGORITHM"] = "HS256"
 app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)
 app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=30)
 app.config["JWT_VERIFY_SUB"] = False
 
 # Ensure tables exist regardless of launch directory.
 init_db()
+register_db(app)
 
 # Enable CORS for all routes
 CORS(app, resources={
@@ -83,7 +124,12 @@ jwt = JWTManager(app)
 socketio = SocketIO(
     app,
     cors_allowed_origins=CORS_ORIGINS,
-    async_mode="gevent"
+    async_mode="gevent",
+    # engine.io's http_compression stays on: it applies per long-polling
+    # response, not per event, and every event other than the pre-deflated
+    # receive_messages_z frames (see _flush_broadcasts) still benefits from it.
+    # Set to e.g. redis://localhost:6379/0 to fan out emits across several workers.
+    message_queue=os.getenv("SOCKETIO_MESSAGE_QUEUE") or None,
 )
 
 # Register blueprints
@@ -101,9 +147,14 @@ def fetch_news_job():
     try:
         with db_session() as db:
             NewsService.fetch_and_store_news(db)
-    except Exception as e:
-        import logging
-        logging.getLogger(__name__).warning(f"Background news job error: {e}")
+    except Exception:
+        logger.exception("Background news job error")
+
+def refresh_standings_job():
+    try:
+        MatchService.refresh_standings()
+    except Exception:
+        logger.exception("Background standings job error")
 
 scheduler = BackgroundScheduler()
 scheduler.add_job(
@@ -118,6 +169,17 @@ scheduler.add_job(
     id="fetch_news_job",
     replace_existing=True,
 )
+scheduler.add_job(
+    func=refresh_standings_job,
+    trigger="interval",
+    # Each run re-fetches a few of the stalest standings tables, spaced out to
+    # stay inside the football-data.org per-minute quota.
+    minutes=5,
+    coalesce=True,
+    misfire_grace_time=300,
+    id="refresh_standings_job",
+    replace_existing=True,
+)
 
 # Avoid duplicate scheduler instances under Flask debug reloader.
 scheduler.start()
@@ -136,6 +198,174 @@ def test_socket():
 def health_check():
     return jsonify({"status": "ok"}), 200
 
+# ========== SOCKET.IO AUTH HELPERS ==========
+
+# Socket handlers verify tokens through the shared claims cache.
+token_cache.init_app(app)
+
+# Per-user token bucket for send_message, checked before any database work.
+MESSAGE_RATE = 5.0    # tokens refilled per second
+MESSAGE_BURST = 10.0  # bucket capacity
+_message_buckets = TTLCache(maxsize=10000, ttl=60)  # {user_id: (tokens, last_refill)}
+_bucket_lock = threading.Lock()
+
+def _allow_message(user_id):
+    """Consume one send token for user_id; False if the bucket is empty."""
+    now = time.monotonic()
+    with _bucket_lock:
+        tokens, last = _message_buckets.get(user_id, (MESSAGE_BURST, now))
+        tokens = min(MESSAGE_BURST, tokens + (now - last) * MESSAGE_RATE)
+        allowed = tokens >= 1
+        _message_buckets[user_id] = (tokens - 1 if allowed else tokens, now)
+    return allowed
+
+# ========== SOCKET.IO BROADCAST BATCHING ==========
+
+# Chat messages are coalesced per room and flushed as one "receive_messages_z"
+# event every BROADCAST_INTERVAL seconds instead of one emit per message.
+BROADCAST_INTERVAL = 0.025
+# Upper bound on messages waiting per room if the flusher falls behind; those
+# rows are already persisted, so clients can recover them from message history.
+MAX_PENDING_PER_ROOM = 2000
+_pending_broadcasts = {}  # {room: deque([message_payload, ...])}
+_pending_lock = threading.Lock()
+_flusher_started = False
+
+def _flush_broadcasts():
+    while True:
+        socketio.sleep(BROADCAST_INTERVAL)
+        with _pending_lock:
+            if not _pending_broadcasts:
+                continue
+            batches = _pending_broadcasts.copy()
+            _pending_broadcasts.clear()
+        for room, messages in batches.items():
+            # One bad payload or emit must not stop delivery to every other room
+            try:
+                # Pack and deflate once; every subscriber receives the same bytes.
+                frame = zlib.compress(msgpack.packb(list(messages)), 1)
+                socketio.emit("receive_messages_z", frame, to=room)
+            except Exception:
+                logger.exception("Failed to broadcast %d message(s) to room %s", len(messages), room)
+
+def _queue_broadcast(room, payload):
+    """Queue a chat message for the next batched emit to its room."""
+    global _flusher_started
+    with _pending_lock:
+        pending = _pending_broadcasts.get(room)
+        if pending is None:
+            pending = _pending_broadcasts[room] = deque(maxlen=MAX_PENDING_PER_ROOM)
+        pending.append(payload)
+        if not _flusher_started:
+            _flusher_started = True
+            socketio.start_background_task(_flush_broadcasts)
+
+# REST-posted messages reach socket subscribers through the same batcher
+app.extensions["chat_broadcast"] = _queue_broadcast
+
+# ========== SOCKET.IO MESSAGE PERSISTENCE ==========
+
+# Chat messages are persisted by a single background writer that drains the
+# queue every WRITE_BATCH_INTERVAL seconds into one multi-row INSERT, so
+# send_message never waits on its own commit.
+WRITE_BATCH_INTERVAL = 0.02
+WRITE_BATCH_SIZE = 500
+_write_queue = queue.Queue(maxsize=10000)  # (row, room, user_payload, message_type, sender_sid)
+_writer_started = False
+_writer_lock = threading.Lock()
+
+def _goal_alert(content):
+    """Return the goal_alert payload for a chat message, or None."""
+    content_lower = content.lower()
+    is_goal = "/goal" in content_lower or "gooooal" in content_lower or "siuuu" in content_lower or "golaso" in content_lower
+    if not is_goal:
+        return None
+    scorer = "A Legend"
+    team_name = "The Champions"
+    if content.strip().lower().startswith("/goal"):
+        parts = content.strip().split(None, 2)
+        scorer = parts[1] if len(parts) > 1 else "A Legend"
+        team_name = parts[2] if len(parts) > 2 else "The Champions"
+    return {"scorer": scorer, "team_name": team_name}
+
+def _next_write_batch():
+    batch = [_write_queue.get()]
+    # Only wait for more rows to accumulate when there isn't already a
+    # full batch backlogged; under sustained load the writer drains back-to-back.
+    if _write_queue.qsize() < WRITE_BATCH_SIZE:
+        socketio.sleep(WRITE_BATCH_INTERVAL)
+    while len(batch) < WRITE_BATCH_SIZE:
+        try:
+            batch.append(_write_queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+def _save_batch(batch):
+    """
+    Insert a batch in one statement. If that fails, retry row by row so a bad
+    row only drops itself and only its sender is told.
+    Returns [(queued_item, (message_id, created_at)), ...] for the saved rows.
+    """
+    with db_session() as db:
+        success, msg, saved = MessageService.create_messages(db, [item[0] for item in batch])
+    if success:
+        return list(zip(batch, saved))
+
+    logger.warning("Batch insert of %d message(s) failed, retrying one by one: %s", len(batch), msg)
+    results = []
+    for item in batch:
+        if len(batch) > 1:
+            with db_session() as db:
+                success, msg, saved = MessageService.create_messages(db, [item[0]])
+        if success:
+            results.append((item, saved[0]))
+        else:
+            logger.warning("Dropped message from %s in room %s: %s", item[2]["username"], item[1], msg)
+            socketio.emit("error", {"message": "Failed to save message"}, to=item[4])
+    return results
+
+def _persist_messages():
+    while True:
+        # The writer is the only consumer of _write_queue; never let it die
+        try:
+            batch = _next_write_batch()
+            saved = _save_batch(batch)
+        except Exception:
+            logger.exception("Message writer failed to persist a batch")
+            continue
+
+        for (row, room, user_payload, message_type, _sid), (message_id, created_at) in saved:
+            try:
+                _queue_broadcast(room, MessageService.new_message_payload(
+                    message_id, created_at, row["content"],
+                    user_payload["id"], user_payload["username"], user_payload["avatar_url"],
+                    row["community_id"], row["media_url"], row["media_description"], message_type
+                ))
+                logger.debug("Message from %s in room %s", user_payload["username"], room)
+
+                alert = _goal_alert(row["content"])
+                if alert:
+                    socketio.emit("goal_alert", alert, to=room)
+            except Exception:
+                logger.exception("Failed to broadcast message %s to room %s", message_id, room)
+
+def _queue_message(row, room, user_payload, message_type, sid):
+    """
+    Hand a validated message to the background writer; sid is the sender's
+    socket, told if the row cannot be saved. Returns False if the queue is full.
+    """
+    global _writer_started
+    with _writer_lock:
+        if not _writer_started:
+            _writer_started = True
+            socketio.start_background_task(_persist_messages)
+    try:
+        _write_queue.put_nowait((row, room, user_payload, message_type, sid))
+        return True
+    except queue.Full:
+        return False
+
 # ========== SECURE SOCKET.IO EVENTS ==========
 
 @socketio.on("join_room")
@@ -145,16 +375,18 @@ def handle_join(data):
     Client must send: { token: "jwt_token", room: "community_id" }
     """
     try:
-        token = data.get("token")
-        room = str(data.get("room"))
-        
-        if not token or not room:
+        try:
+            payload = RoomPayload.model_validate(data)
+        except ValidationError:
             emit("error", {"message": "Token and room ID are required"})
             return
+        token = payload.token
+        room_id = payload.room
+        room = str(room_id)  # Socket.IO room name
         
         # Decode and validate JWT token
         try:
-            decoded = decode_token(token)
+            decoded = token_cache.decode_cached(token)
             user_id = int(decoded['sub'])
         except Exception as e:
             emit("error", {"message": f"Invalid token: {str(e)}"})
@@ -162,7 +394,7 @@ def handle_join(data):
         
         # Get user from database
         with db_session() as db:
-            user = db.query(User).filter(User.id == user_id).first()
+            user, member = ChatCacheService.get_user_and_membership(db, user_id, room_id)
             
             if not user:
                 emit("error", {"message": "User not found"})
@@ -173,11 +405,6 @@ def handle_join(data):
                 return
             
             # Verify community membership
-            member = db.query(CommunityMember).filter_by(
-                user_id=user_id,
-                community_id=int(room)
-            ).first()
-            
             if not member:
                 emit("error", {"message": "You must join this community before chatting"})
                 return
@@ -197,10 +424,10 @@ def handle_join(data):
             "message": f"{user_payload['username']} joined the chat"
         }, to=room, broadcast=True)
         
-        print(f"User {user_payload['username']} (ID: {user_payload['id']}) joined room {room}")
+        logger.debug("User %s (ID: %s) joined room %s", user_payload["username"], user_payload["id"], room)
         
     except Exception as e:
-        print(f"Join room error: {str(e)}")
+        logger.exception("Join room error")
         emit("error", {"message": f"Failed to join room: {str(e)}"})
 
 @socketio.on("leave_room")
@@ -210,17 +437,18 @@ def handle_leave(data):
     Client must send: { token: "jwt_token", room: "community_id" }
     """
     try:
-        token = data.get("token")
-        room = str(data.get("room"))
-        
-        if not token or not room:
+        try:
+            payload = RoomPayload.model_validate(data)
+        except ValidationError:
             return
+        token = payload.token
+        room = str(payload.room)
         
-        decoded = decode_token(token)
+        decoded = token_cache.decode_cached(token)
         user_id = int(decoded['sub'])
         
         with db_session() as db:
-            user = db.query(User).filter(User.id == user_id).first()
+            user = ChatCacheService.get_user(db, user_id)
             user_payload = None
             if user:
                 user_payload = {
@@ -237,10 +465,10 @@ def handle_leave(data):
                 "message": f"{user_payload['username']} left the chat"
             }, to=room, broadcast=True)
             
-            print(f"User {user_payload['username']} left room {room}")
+            logger.debug("User %s left room %s", user_payload["username"], room)
         
-    except Exception as e:
-        print(f"Leave room error: {str(e)}")
+    except Exception:
+        logger.exception("Leave room error")
 
 @socketio.on("typing")
 def handle_typing(data):
@@ -251,11 +479,11 @@ def handle_typing(data):
         
         if not token or not room: return
         
-        decoded = decode_token(token)
+        decoded = token_cache.decode_cached(token)
         user_id = int(decoded['sub'])
         
         with db_session() as db:
-            user = db.query(User).filter(User.id == user_id).first()
+            user = ChatCacheService.get_user(db, user_id)
             if not user:
                 return
             username = user.username
@@ -274,39 +502,38 @@ def handle_message(data):
     Client must send: { token: "jwt_token", room: "community_id", message: "content" }
     """
     try:
-        token = data.get("token")
-        room = str(data.get("room"))
-        content = data.get("message")
-        media_url = data.get("media_url")
-        message_type = data.get("message_type", "text")
-        
-        if not token or not room or (not content and not media_url):
-            emit("error", {"message": "Token, room, and message or media are required"})
+        try:
+            payload = MessagePayload.model_validate(data)
+        except ValidationError as e:
+            emit("error", {"message": payload_error(e)})
             return
-            
-        content = content or ""
+        token = payload.token
+        room_id = payload.room
+        room = str(room_id)  # Socket.IO room name
+        content = payload.message or ""
+        media_url = payload.media_url
+        message_type = payload.message_type
         
         # Validate JWT
         try:
-            decoded = decode_token(token)
+            decoded = token_cache.decode_cached(token)
             user_id = int(decoded['sub'])
         except Exception as e:
             emit("error", {"message": "Invalid or expired token"})
             return
+
+        if not _allow_message(user_id):
+            emit("error", {"message": "You are sending messages too fast. Slow down!"})
+            return
         
         with db_session() as db:
-            user = db.query(User).filter(User.id == user_id).first()
+            user, member = ChatCacheService.get_user_and_membership(db, user_id, room_id)
             
             if not user or user.is_banned:
                 emit("error", {"message": "Unauthorized"})
                 return
             
             # Verify membership
-            member = db.query(CommunityMember).filter_by(
-                user_id=user_id,
-                community_id=int(room)
-            ).first()
-            
             if not member:
                 emit("error", {"message": "You are not a member of this community"})
                 return
@@ -324,7 +551,9 @@ def handle_message(data):
                 "avatar_url": user.avatar_url,
             }
             
-        def process_and_save():
+        request_sid = request.sid
+
+        def describe_and_queue():
             media_desc = None
             if media_url:
                 if message_type == "sticker":
@@ -332,7 +561,7 @@ def handle_message(data):
                 else:
                     try:
                         # Very simple moderation/description using Gemini
-                        client = genai.Client(api_key=os.getenv("GEMINI_API_KEY", "").split(",")[0].strip())
+                        client = get_gemini_client(os.getenv("GEMINI_API_KEY", "").split(",")[0].strip())
                         prompt = f"Please describe this image in one short sentence for visually impaired fans: {media_url}"
                         from google.genai import types
                         response = client.models.generate_content(
@@ -352,53 +581,30 @@ def handle_message(data):
                             )
                         )
                         media_desc = response.text.strip()
-                    except Exception as e:
-                        print(f"Gemini error: {e}")
+                    except Exception:
+                        logger.exception("Gemini error")
                         media_desc = "Media attached."
- 
-            with db_session() as db_thread:
-                success, msg, message = MessageService.create_message(
-                    db_thread, content.strip(), user_id, int(room), media_url=media_url, media_description=media_desc
-                )
-            
-            if success:
-                socketio.emit("receive_message", {
-                    "id": message.id,
-                    "user_id": user_payload["id"],
-                    "username": user_payload["username"],
-                    "avatar_url": user_payload["avatar_url"],
-                    "content": message.content,
-                    "media_url": message.media_url,
-                    "media_description": message.media_description,
-                    "is_highlighted": message.is_highlighted.isoformat() if message.is_highlighted else None,
-                    "created_at": message.created_at.isoformat(),
-                    "message_type": message_type
-                }, to=room)
-                print(f"Message from {user_payload['username']} in room {room}")
-
-                # Trigger goal_alert if message matches keywords or command
-                content_lower = content.lower()
-                is_goal = "/goal" in content_lower or "gooooal" in content_lower or "siuuu" in content_lower or "golaso" in content_lower
-                if is_goal:
-                    scorer = "A Legend"
-                    team_name = "The Champions"
-                    if content.strip().lower().startswith("/goal"):
-                        parts = content.strip().split(None, 2)
-                        scorer = parts[1] if len(parts) > 1 else "A Legend"
-                        team_name = parts[2] if len(parts) > 2 else "The Champions"
-                    
-                    socketio.emit("goal_alert", {
-                        "scorer": scorer,
-                        "team_name": team_name
-                    }, to=room)
-            else:
-                socketio.emit("error", {"message": f"Failed to save message: {msg}"}, to=room)
-                
-        # Run in background to avoid blocking socketio thread
-        threading.Thread(target=process_and_save, daemon=True).start()
+
+            row = {
+                "content": content,
+                "user_id": user_id,
+                "community_id": room_id,
+                "media_url": media_url,
+                "media_description": media_desc
+            }
+            return _queue_message(row, room, user_payload, message_type, request_sid)
+
+        if media_url and message_type != "sticker":
+            # Gemini description is slow; run it off the socket thread
+            def describe_in_background():
+                if not describe_and_queue():
+                    socketio.emit("error", {"message": "Server is busy, please try again."}, to=request_sid)
+            threading.Thread(target=describe_in_background, daemon=True).start()
+        elif not describe_and_queue():
+            emit("error", {"message": "Server is busy, please try again."})
             
     except Exception as e:
-        print(f"Send message error: {str(e)}")
+        logger.exception("Send message error")
         emit("error", {"message": f"Failed to send message: {str(e)}"})
 
 @socketio.on("mute_user")
@@ -414,7 +620,7 @@ def handle_mute_user(data):
             return
             
         try:
-            decoded = decode_token(token)
+            decoded = token_cache.decode_cached(token)
             actor_user_id = int(decoded['sub'])
         except Exception:
             emit("error", {"message": "Invalid token"})
@@ -455,7 +661,7 @@ def handle_kick_user(data):
             return
             
         try:
-            decoded = decode_token(token)
+            decoded = token_cache.decode_cached(token)
             actor_user_id = int(decoded['sub'])
         except Exception:
             emit("error", {"message": "Invalid token"})
@@ -493,7 +699,7 @@ def handle_ban_user(data):
             return
             
         try:
-            decoded = decode_token(token)
+            decoded = token_cache.decode_cached(token)
             actor_user_id = int(decoded['sub'])
         except Exception:
             emit("error", {"message": "Invalid token"})
@@ -531,7 +737,7 @@ def handle_pin_message(data):
             return
             
         try:
-            decoded = decode_token(token)
+            decoded = token_cache.decode_cached(token)
             actor_user_id = int(decoded['sub'])
         except Exception:
             emit("error", {"message": "Invalid token"})
@@ -562,12 +768,12 @@ def handle_tactic_draw(data):
         if not token or not room:
             return
         try:
-            decoded = decode_token(token)
+            decoded = token_cache.decode_cached(token)
         except Exception:
             return
         emit("tactic:draw", data, to=room, include_self=False)
-    except Exception as e:
-        print(f"tactic:draw error: {e}")
+    except Exception:
+        logger.exception("tactic:draw error")
 
 @socketio.on("tactic:move-token")
 def handle_tactic_move_token(data):
@@ -577,12 +783,12 @@ def handle_tactic_move_token(data):
         if not token or not room:
             return
         try:
-            decoded = decode_token(token)
+            decoded = token_cache.decode_cached(token)
         except Exception:
             return
         emit("tactic:move-token", data, to=room, include_self=False)
-    except Exception as e:
-        print(f"tactic:move-token error: {e}")
+    except Exception:
+        logger.exception("tactic:move-token error")
 
 @socketio.on("tactic:clear")
 def handle_tactic_clear(data):
@@ -592,12 +798,12 @@ def handle_tactic_clear(data):
         if not token or not room:
             return
         try:
-            decoded = decode_token(token)
+            decoded = token_cache.decode_cached(token)
         except Exception:
             return
         emit("tactic:clear", data, to=room, include_self=False)
-    except Exception as e:
-        print(f"tactic:clear error: {e}")
+    except Exception:
+        logger.exception("tactic:clear error")
 
 @socketio.on("tactic:toggle-cooperative")
 def handle_tactic_toggle_cooperative(data):
@@ -607,12 +813,12 @@ def handle_tactic_toggle_cooperative(data):
         if not token or not room:
             return
         try:
-            decoded = decode_token(token)
+            decoded = token_cache.decode_cached(token)
         except Exception:
             return
         emit("tactic:toggle-cooperative", data, to=room, include_self=False)
-    except Exception as e:
-        print(f"tactic:toggle-cooperative error: {e}")
+    except Exception:
+        logger.exception("tactic:toggle-cooperative error")
 
 # ========== RIVALRY SOCKET.IO EVENTS ==========
 
@@ -633,7 +839,7 @@ def handle_join_rivalry(data):
         
         # Decode and validate JWT token
         try:
-            decoded = decode_token(token)
+            decoded = token_cache.decode_cached(token)
             user_id = int(decoded['sub'])
         except Exception as e:
             emit("error", {"message": f"Invalid token: {str(e)}"})
@@ -641,7 +847,7 @@ def handle_join_rivalry(data):
         
         # Get user from database
         with db_session() as db:
-            user = db.query(User).filter(User.id == user_id).first()
+            user = ChatCacheService.get_user(db, user_id)
             
             if not user:
                 emit("error", {"message": "User not found"})
@@ -669,10 +875,10 @@ def handle_join_rivalry(data):
             "message": f"{user_payload['username']} ({team_affinity}) joined the arena!"
         }, to=room_name, broadcast=True)
         
-        print(f"User {user_payload['username']} joined rivalry room {room_name} with affinity {team_affinity}")
+        logger.debug("User %s joined rivalry room %s with affinity %s", user_payload["username"], room_name, team_affinity)
         
     except Exception as e:
-        print(f"Join rivalry room error: {str(e)}")
+        logger.exception("Join rivalry room error")
         emit("error", {"message": f"Failed to join rivalry room: {str(e)}"})
 
 @socketio.on("leave_rivalry")
@@ -686,13 +892,13 @@ def handle_leave_rivalry(data):
             return
         
         try:
-            decoded = decode_token(token)
+            decoded = token_cache.decode_cached(token)
             user_id = int(decoded['sub'])
         except Exception:
             return
         
         with db_session() as db:
-            user = db.query(User).filter(User.id == user_id).first()
+            user = ChatCacheService.get_user(db, user_id)
             if not user:
                 return
             username = user.username
@@ -706,8 +912,8 @@ def handle_leave_rivalry(data):
             "team_affinity": team_affinity,
             "message": f"{username} left the arena"
         }, to=room_name, broadcast=True)
-    except Exception as e:
-        print(f"Leave rivalry error: {str(e)}")
+    except Exception:
+        logger.exception("Leave rivalry error")
 
 rivalry_warnings = {}
 
@@ -728,14 +934,14 @@ def handle_send_rivalry_message(data):
             return
         
         try:
-            decoded = decode_token(token)
+            decoded = token_cache.decode_cached(token)
             user_id = int(decoded['sub'])
         except Exception as e:
             emit("error", {"message": "Invalid or expired token"})
             return
         
         with db_session() as db:
-            user = db.query(User).filter(User.id == user_id).first()
+            user = ChatCacheService.get_user(db, user_id)
             if not user or user.is_banned:
                 emit("error", {"message": "Unauthorized"})
                 return
@@ -756,7 +962,7 @@ def handle_send_rivalry_message(data):
                 query = command[1] if len(command) > 1 else ""
                 
                 try:
-                    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY", "").split(",")[0].strip())
+                    client = get_gemini_client(os.getenv("GEMINI_API_KEY", "").split(",")[0].strip())
                     if content_stripped.startswith('/banter'):
                         prompt = f"Generate a short, witty, clean football banter line (max 150 chars) from a {team_affinity} fan's perspective about {query if query else 'the rivalry match'}."
                     else:
@@ -780,7 +986,7 @@ def handle_send_rivalry_message(data):
             else:
                 # 2. AI Respect Filter (Toxicity Check)
                 try:
-                    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY", "").split(",")[0].strip())
+                    client = get_gemini_client(os.getenv("GEMINI_API_KEY", "").split(",")[0].strip())
                     prompt = f"Analyze this message for extreme toxicity, racism, or severe abuse in a football fan context. Is it highly toxic? Answer YES or NO.\n\nMessage: '{content_stripped}'"
                     from google.genai import types
                     response = client.models.generate_content(
@@ -802,8 +1008,8 @@ def handle_send_rivalry_message(data):
                         else:
                             emit("warning_alert", {"message": f"YELLOW CARD: Warning {warnings}/3. Keep the banter respectful!"}, to=request.sid)
                         return
-                except Exception as e:
-                    print(f"Respect Filter error: {e}")
+                except Exception:
+                    logger.exception("Respect Filter error")
                     pass
             
             # Persist rivalry message
@@ -839,10 +1045,10 @@ def handle_send_rivalry_message(data):
                 "team_name": team_name
             }, to=room_name, broadcast=True)
 
-        print(f"Rivalry message saved and broadcasted to {room_name}")
+        logger.debug("Rivalry message saved and broadcasted to %s", room_name)
         
     except Exception as e:
-        print(f"Send rivalry message error: {str(e)}")
+        logger.exception("Send rivalry message error")
         emit("error", {"message": f"Failed to send message: {str(e)}"})
 
 @socketio.on("rivalry_respect_upvote")
@@ -861,7 +1067,7 @@ def handle_rivalry_respect_upvote(data):
             return
         
         try:
-            decoded = decode_token(token)
+            decoded = token_cache.decode_cached(token)
             user_id = int(decoded['sub'])
         except Exception:
             emit("error", {"message": "Invalid token"})
@@ -900,11 +1106,11 @@ def handle_rivalry_respect_upvote(data):
                     "home_respect_score": room.home_respect_score,
                     "away_respect_score": room.away_respect_score
                 }, to=room_name, broadcast=True)
-                print(f"Respect upvote registered for message {message_id} in {room_name}")
+                logger.debug("Respect upvote registered for message %s in %s", message_id, room_name)
             else:
                 emit("error", {"message": "Rivalry room not found"})
     except Exception as e:
-        print(f"Respect upvote error: {str(e)}")
+        logger.exception("Respect upvote error")
         emit("error", {"message": f"Failed to upvote: {str(e)}"})
 
 # ========== END SOCKET.IO EVENTS ==========
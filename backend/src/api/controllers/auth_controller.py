@@ -2,6 +2,7 @@ from flask import request, jsonify
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from sqlalchemy.orm import joinedload
 from src.services.auth_service import AuthService
+from src.services.chat_cache_service import ChatCacheService
 from src.db.connection import db_session
 from src.db.models.user import User
 from src.db.models.community_member import CommunityMember
@@ -185,6 +186,7 @@ class AuthController:
                     user.set_password(data['new_password'])
 
                 db.commit()
+                ChatCacheService.invalidate_user(user_id)
 
                 return jsonify({
                     'success': True,
@@ -52,7 +52,7 @@ class CommunityController:
                 communities = CommunityService.get_all_communities(db)
                 return jsonify({
                     'success': True,
-                    'communities': [c.to_dict() for c in communities]
+                    'communities': communities
                 }), 200
         except Exception as e:
             return jsonify({
@@ -70,7 +70,7 @@ class CommunityController:
                 communities = CommunityService.get_user_communities(db, user_id)
                 return jsonify({
                     'success': True,
-                    'communities': [c.to_dict() for c in communities]
+                    'communities': communities
                 }), 200
         except Exception as e:
             return jsonify({
@@ -250,18 +250,20 @@ class CommunityController:
 
                 club_name = community.club_name or community.name
 
-                # Get latest match data
-                match_data = MatchService.get_matches_for_team(club_name)
-                if match_data.get('matches') and len(match_data['matches']) > 0:
-                    match_data = match_data['matches'][0]
-                else:
-                    match_data = None
+                # Fetch the latest match upstream while the chat history is read
+                match_future = MatchService.submit_matches_for_team(club_name)
 
                 # Get recent chat messages (last 50)
-                messages = MessageService.get_community_messages(db, community_id, 50, 0)
+                messages = MessageService.get_community_messages_before(db, community_id, None, 50)
                 chat_messages = []
                 for m in messages:
-                    chat_messages.append({'username': m.username, 'content': m.content})
+                    chat_messages.append({'username': m['username'], 'content': m['content']})
+
+                match_data = match_future.result()
+                if match_data.get('matches') and len(match_data['matches']) > 0:
+                    match_data = match_data['matches'][0]
+                else:
+                    match_data = None
 
                 summary = AIStatsService.generate_tactical_summary(match_data, chat_messages)
 
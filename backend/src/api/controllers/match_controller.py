@@ -1,6 +1,25 @@
+import hashlib
 from flask import request, jsonify
 from src.services.match_service import MatchService
 
+LIVE_MAX_AGE = 30
+MATCHES_MAX_AGE = 60
+COMPETITIONS_MAX_AGE = 300
+
+def _cacheable(payload, max_age, fallback=False):
+    """
+    JSON response that browsers/CDNs may cache for max_age seconds.
+    Carries a content ETag so revalidation returns 304 without a body.
+    A fallback (upstream unavailable) payload is sent with no-store instead.
+    """
+    response = jsonify(payload)
+    if fallback:
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    response.headers['Cache-Control'] = f'public, max-age={max_age}'
+    response.set_etag(hashlib.blake2b(response.get_data(), digest_size=16).hexdigest())
+    return response.make_conditional(request)
+
 class MatchController:
     @staticmethod
     def get_live_matches():
@@ -10,11 +29,11 @@ class MatchController:
         """
         try:
             data = MatchService.get_live_matches()
-            return jsonify({
+            return _cacheable({
                 'success': True,
                 'count': data.get('count', 0),
                 'matches': data.get('matches', [])
-            }), 200
+            }, LIVE_MAX_AGE, MatchService.is_fallback(data))
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -29,11 +48,11 @@ class MatchController:
         """
         try:
             data = MatchService.get_todays_matches_grouped()
-            return jsonify({
+            return _cacheable({
                 'success': True,
                 'count': data.get('count', 0),
                 'grouped_matches': data.get('grouped_matches', [])
-            }), 200
+            }, LIVE_MAX_AGE, MatchService.is_fallback(data))
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -48,11 +67,11 @@ class MatchController:
         """
         try:
             data = MatchService.get_available_competitions()
-            return jsonify({
+            return _cacheable({
                 'success': True,
                 'count': data.get('count', 0),
                 'competitions': data.get('competitions', [])
-            }), 200
+            }, COMPETITIONS_MAX_AGE, MatchService.is_fallback(data))
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -76,11 +95,11 @@ class MatchController:
                 }), 400
             
             data = MatchService.get_matches_by_date_range(date_from, date_to)
-            return jsonify({
+            return _cacheable({
                 'success': True,
                 'count': data.get('count', 0),
                 'matches': data.get('matches', [])
-            }), 200
+            }, MATCHES_MAX_AGE, MatchService.is_fallback(data))
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -121,11 +140,11 @@ class MatchController:
                 date_from=date_from,
                 date_to=date_to
             )
-            return jsonify({
+            return _cacheable({
                 'success': True,
                 'count': data.get('count', 0),
                 'matches': data.get('matches', [])
-            }), 200
+            }, MATCHES_MAX_AGE, MatchService.is_fallback(data))
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -139,10 +158,10 @@ class MatchController:
         """
         try:
             data = MatchService.get_competition_standings(competition_id)
-            return jsonify({
+            return _cacheable({
                 'success': True,
                 'standings': data.get('standings', [])
-            }), 200
+            }, COMPETITIONS_MAX_AGE, MatchService.is_fallback(data))
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -160,11 +179,11 @@ class MatchController:
             limit = request.args.get('limit', 10, type=int)
             
             data = MatchService.get_team_matches(team_id, status=status, limit=limit)
-            return jsonify({
+            return _cacheable({
                 'success': True,
                 'count': data.get('count', 0),
                 'matches': data.get('matches', [])
-            }), 200
+            }, MATCHES_MAX_AGE, MatchService.is_fallback(data))
         except Exception as e:
             return jsonify({
                 'success': False,
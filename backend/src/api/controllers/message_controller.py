@@ -1,9 +1,10 @@
-from flask import request, jsonify
+from flask import current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.services.message_service import MessageService
 from src.services.community_service import CommunityService
+from src.services.chat_cache_service import ChatCacheService
 from src.db.connection import db_session
-from src.api.controllers.utils import get_json_payload
+from src.api.controllers.utils import get_json_payload, json_response
 
 class MessageController:
     @staticmethod
@@ -22,28 +23,31 @@ class MessageController:
 
             user_id = int(get_jwt_identity())
             with db_session() as db:
-                # Check if user is a member of the community
-                if not CommunityService.is_member(db, user_id, community_id):
-                    return jsonify({
-                        'success': False,
-                        'message': 'You must be a member of this community to send messages'
-                    }), 403
-
-                # Create message in database
-                success, msg, message = MessageService.create_message(
+                # Membership is enforced by the INSERT itself
+                success, msg, saved = MessageService.create_member_message(
                     db, content.strip(), user_id, community_id
                 )
 
                 if success:
+                    user = ChatCacheService.get_user(db, user_id)
+                    message = MessageService.new_message_payload(
+                        saved.id, saved.created_at, content.strip(), user_id,
+                        user.username if user else None, user.avatar_url if user else None,
+                        community_id
+                    )
+                    # Push to everyone in the room so clients never need to poll
+                    broadcast = current_app.extensions.get('chat_broadcast')
+                    if broadcast:
+                        broadcast(str(community_id), message)
                     return jsonify({
                         'success': True,
-                        'message': message.to_dict()
+                        'message': message
                     }), 201
                 else:
                     return jsonify({
                         'success': False,
                         'message': msg
-                    }), 400
+                    }), 403 if msg == MessageService.NOT_A_MEMBER else 400
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -58,7 +62,7 @@ class MessageController:
             user_id = int(get_jwt_identity())
             with db_session() as db:
                 # Check if user is a member of the community
-                if not CommunityService.is_member(db, user_id, community_id):
+                if not ChatCacheService.is_member(db, user_id, community_id):
                     return jsonify({
                         'success': False,
                         'message': 'You must be a member to view messages'
@@ -66,22 +70,55 @@ class MessageController:
 
                 # Get pagination parameters
                 limit = request.args.get('limit', 50, type=int)
-                offset = request.args.get('offset', 0, type=int)
 
                 # Limit maximum messages per request
                 limit = max(1, min(limit, 100))
-                offset = max(offset, 0)
 
-                messages = MessageService.get_community_messages(db, community_id, limit, offset)
-                message_count = MessageService.get_message_count(db, community_id)
+                # Both paths fetch one extra row to learn whether another page exists
+                if 'offset' in request.args:
+                    # Deprecated: offset paging from the oldest message; use before_id instead
+                    offset = max(request.args.get('offset', 0, type=int), 0)
+                    messages = MessageService.get_community_messages(db, community_id, limit + 1, offset)
+                    has_more = len(messages) > limit
 
-                return jsonify({
+                    return json_response({
+                        'success': True,
+                        'messages': messages[:limit],
+                        'has_more': has_more,
+                        'limit': limit,
+                        'offset': offset
+                    })
+
+                # Forward paging from a known message, e.g. to catch up after a reconnect
+                after_id = request.args.get('after_id', type=int)
+                if after_id is not None:
+                    messages = MessageService.get_community_messages_after(db, community_id, after_id, limit + 1)
+                    has_more = len(messages) > limit
+                    messages = messages[:limit]
+
+                    return json_response({
+                        'success': True,
+                        'messages': messages,
+                        'has_more': has_more,
+                        'limit': limit,
+                        'next_cursor': messages[-1]['id'] if has_more else None
+                    })
+
+                # Cursor paging: newest messages first, then older pages via before_id
+                before_id = request.args.get('before_id', type=int)
+                messages = MessageService.get_community_messages_before(db, community_id, before_id, limit + 1)
+                has_more = len(messages) > limit
+                if has_more:
+                    # Chronological order, so the extra row is the oldest one
+                    messages = messages[1:]
+
+                return json_response({
                     'success': True,
-                    'messages': [m.to_dict() for m in messages],
-                    'total_count': message_count,
+                    'messages': messages,
+                    'has_more': has_more,
                     'limit': limit,
-                    'offset': offset
-                }), 200
+                    'next_cursor': messages[0]['id'] if has_more else None
+                })
         except Exception as e:
             return jsonify({
                 'success': False,
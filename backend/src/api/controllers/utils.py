@@ -1,7 +1,16 @@
-from flask import request
+import orjson
+from flask import Response, request
 
 
 def get_json_payload():
     """Parse JSON request body, returning an empty dict on failure."""
     data = request.get_json(silent=True)
     return data if isinstance(data, dict) else {}
+
+
+def json_response(payload, status=200):
+    """
+    Serialize payload straight to an orjson response.
+    Naive datetimes are written as ISO 8601, same as datetime.isoformat().
+    """
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
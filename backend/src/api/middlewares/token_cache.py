@@ -0,0 +1,48 @@
+import hashlib
+import logging
+import threading
+import time
+
+import jwt
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Verified JWT claims keyed by a digest of the raw token. A socket client sends
+# the same token with every event, so only the first one pays for verification.
+_token_cache = TTLCache(maxsize=10000, ttl=30)
+_lock = threading.RLock()
+
+# Resolved once from the JWTManager config by init_app()
+_key = None
+_algorithms = ["HS256"]
+_options = {"verify_aud": False}
+
+
+def init_app(app):
+    """Read the signing key and algorithm JWTManager was configured with"""
+    global _key, _algorithms, _options
+    # Same resolution as flask_jwt_extended: JWT_SECRET_KEY, else SECRET_KEY
+    _key = app.config.get("JWT_SECRET_KEY") or app.config.get("SECRET_KEY")
+    if not _key:
+        logger.warning("Neither JWT_SECRET_KEY nor SECRET_KEY is set; socket tokens will be rejected")
+    _algorithms = [app.config["JWT_ALGORITHM"]]
+    _options = {"verify_aud": False, "verify_sub": app.config.get("JWT_VERIFY_SUB", True)}
+
+
+def decode_cached(token):
+    """
+    Verify a JWT and return its {"sub", "exp"} claims, reusing claims already
+    verified for the same token until the cache TTL or the token expires
+    """
+    digest = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    with _lock:
+        claims = _token_cache.get(digest)
+    if claims and claims["exp"] > time.time():
+        return claims
+
+    decoded = jwt.decode(token, _key, algorithms=_algorithms, options=_options)
+    claims = {"sub": decoded["sub"], "exp": decoded["exp"]}
+    with _lock:
+        _token_cache[digest] = claims
+    return claims
@@ -2,6 +2,7 @@ import json
 from datetime import datetime, timedelta
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import joinedload
 from src.db.connection import db_session
 from src.db.models.new_models import RivalryRoom, RivalryMessage, PredictionPoll, UserPrediction
 from src.db.models.user import User
@@ -58,17 +59,25 @@ def _club_key(value):
     return "".join(ch for ch in str(value or "").lower() if ch.isalnum())
 
 
-def _alias_matches(team_name, aliases):
-    team_key = _club_key(team_name)
-    return any(_club_key(alias) == team_key or _club_key(alias) in team_key for alias in aliases)
+# Alias keys normalized once; _match_derby runs for every upcoming fixture
+_DERBY_ALIAS_KEYS = [
+    (derby, tuple(_club_key(a) for a in derby["aliases"][0]), tuple(_club_key(a) for a in derby["aliases"][1]))
+    for derby in RIVALRY_DERBIES
+]
+
+
+def _alias_matches(team_key, alias_keys):
+    # An exact key match is also a substring match
+    return any(alias_key in team_key for alias_key in alias_keys)
 
 
 def _match_derby(home_name, away_name):
-    for derby in RIVALRY_DERBIES:
-        first_aliases, second_aliases = derby["aliases"]
-        first_home = _alias_matches(home_name, first_aliases) and _alias_matches(away_name, second_aliases)
-        second_home = _alias_matches(home_name, second_aliases) and _alias_matches(away_name, first_aliases)
-        if first_home or second_home:
+    home_key = _club_key(home_name)
+    away_key = _club_key(away_name)
+    for derby, first_keys, second_keys in _DERBY_ALIAS_KEYS:
+        if _alias_matches(home_key, first_keys) and _alias_matches(away_key, second_keys):
+            return derby
+        if _alias_matches(home_key, second_keys) and _alias_matches(away_key, first_keys):
             return derby
     return None
 
@@ -335,7 +344,10 @@ def get_rivalry_messages(session_id):
                     'message': 'Rivalry room not found'
                 }), 404
                 
-            messages = db.query(RivalryMessage).filter(
+            # Authors are loaded in the same query; to_dict reads username/avatar
+            messages = db.query(RivalryMessage).options(
+                joinedload(RivalryMessage.user)
+            ).filter(
                 RivalryMessage.rivalry_room_id == session_id
             ).order_by(RivalryMessage.created_at.desc()).limit(limit).offset(offset).all()
             
@@ -7,7 +7,8 @@ from urllib.parse import urlparse
 import requests
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
-from sqlalchemy import or_
+from sqlalchemy import func, or_
+from sqlalchemy.orm import joinedload, selectinload
 from src.db.connection import db_session
 from src.db.models.new_models import TransferRumor, RumorRating
 from src.services.match_service import MatchService
@@ -716,9 +717,11 @@ def get_rumors():
                     TransferRumor.from_club.ilike(search_pattern),
                     TransferRumor.to_club.ilike(search_pattern),
                 ))
-            total_count = base_query.count()
+            total_count = base_query.with_entities(func.count(TransferRumor.id)).scalar()
             rumors = (
                 base_query
+                # Cards read the author and every rating; load them up front
+                .options(joinedload(TransferRumor.user), selectinload(TransferRumor.ratings))
                 .order_by(TransferRumor.created_at.desc())
                 .limit(limit)
                 .offset(offset)
@@ -0,0 +1,32 @@
+from typing import Annotated, Optional
+
+from pydantic import BaseModel, StringConstraints, ValidationError, model_validator
+
+
+class RoomPayload(BaseModel):
+    """join_room / leave_room: { token, room }"""
+    token: Annotated[str, StringConstraints(min_length=1)]
+    room: int
+
+
+class MessagePayload(RoomPayload):
+    """send_message: { token, room, message?, media_url?, message_type? }"""
+    message: Optional[Annotated[str, StringConstraints(strip_whitespace=True, max_length=4000)]] = None
+    media_url: Optional[str] = None
+    message_type: str = "text"
+
+    @model_validator(mode="after")
+    def require_content(self):
+        if not self.message and not self.media_url:
+            raise ValueError("Token, room, and message or media are required")
+        return self
+
+
+def payload_error(error: ValidationError):
+    """Human-readable message for the first validation failure"""
+    first = error.errors()[0]
+    if first["type"] == "value_error":
+        return str(first["ctx"]["error"])
+    if not first["loc"]:
+        return f"Invalid payload: {first['msg']}"
+    return f"Invalid {first['loc'][0]}: {first['msg']}"
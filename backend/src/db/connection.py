@@ -4,6 +4,7 @@ from pathlib import Path
 
 from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.schema import CreateIndex
 
 from src.db.models.club_news import ClubNews
 from src.db.models.community import Community
@@ -39,10 +40,23 @@ def _resolve_database_url(database_url: str) -> str:
 
 DATABASE_URL = _resolve_database_url(DATABASE_URL)
 
-engine_kwargs = {"echo": False, "pool_pre_ping": True}
+engine_kwargs = {
+    "echo": False,
+    "pool_pre_ping": True,
+    # SQLAlchemy caches compiled SQL per statement shape and reuses it across
+    # requests; size it so the app's hot queries never get evicted.
+    "query_cache_size": int(os.getenv("DB_QUERY_CACHE_SIZE", "1200")),
+}
 
 if DATABASE_URL.startswith("sqlite"):
     engine_kwargs["connect_args"] = {"check_same_thread": False}
+else:
+    # Keep a warm pool of server connections shared by requests and socket events.
+    engine_kwargs.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", "25")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "25")),
+        pool_recycle=1800,
+    )
 
 engine = create_engine(DATABASE_URL, **engine_kwargs)
 SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
@@ -93,6 +107,16 @@ def _apply_sqlite_schema_patches():
                     connection.execute(text(alter_sql))
 
 
+def _create_missing_indexes():
+    """Create model indexes on tables that already existed (create_all skips them)."""
+    # IF NOT EXISTS rather than checkfirst: reflection cannot see
+    # expression indexes such as lower(email) on SQLite
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+
+
 def _remove_legacy_inserted_rows():
     """Delete rows inserted by older development startup code."""
     db = SessionLocal()
@@ -197,17 +221,21 @@ def init_db():
     """Initialize database schema without inserting development data."""
     Base.metadata.create_all(bind=engine)
     _apply_sqlite_schema_patches()
+    _create_missing_indexes()
     _remove_legacy_inserted_rows()
     print("Database initialized successfully!")
 
 
 def get_db():
-    """Dependency to get database session."""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+    """Return the request's scoped session; register_db() removes it at teardown."""
+    return SessionLocal()
+
+
+def register_db(app):
+    """Release the scoped session when each Flask app context ends."""
+    @app.teardown_appcontext
+    def remove_session(exception=None):
+        SessionLocal.remove()
 
 
 @contextmanager
@@ -217,4 +245,5 @@ def db_session():
     try:
         yield db
     finally:
-        db.close()
+        # Return the connection to the pool and drop the thread-local session.
+        SessionLocal.remove()
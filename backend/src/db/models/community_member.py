@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from src.db.models.user import Base
@@ -18,4 +18,9 @@ class CommunityMember(Base):
     user = relationship('User', back_populates='memberships')
     community = relationship('Community', back_populates='members')
     
-    __table_args__ = (UniqueConstraint('user_id', 'community_id', name='unique_user_community'),)
+    __table_args__ = (
+        # Also serves (user_id, community_id) membership lookups
+        UniqueConstraint('user_id', 'community_id', name='unique_user_community'),
+        # Member lists are read per community in join order
+        Index('ix_community_members_community_joined', 'community_id', 'joined_at'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from src.db.models.user import Base
@@ -20,6 +20,12 @@ class Message(Base):
     # Relationships
     user = relationship('User', back_populates='messages')
     community = relationship('Community', back_populates='messages')
+
+    # Room history is read per community, by created_at or by id cursor
+    __table_args__ = (
+        Index('ix_messages_community_created', 'community_id', 'created_at'),
+        Index('ix_messages_community_id_id', 'community_id', id.desc()),
+    )
     
     def to_dict(self):
         return {
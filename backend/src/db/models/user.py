@@ -1,10 +1,13 @@
 from datetime import datetime
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from flask_bcrypt import Bcrypt
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Index, func
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
-bcrypt = Bcrypt()
+bcrypt = Bcrypt()  # only used to verify legacy hashes
+password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=4)
 
 class User(Base):
     __tablename__ = 'users'
@@ -27,13 +30,34 @@ class User(Base):
     memberships = relationship('CommunityMember', back_populates='user', cascade='all, delete-orphan')
     messages = relationship('Message', back_populates='user', cascade='all, delete-orphan')
 
+    # Login and registration match case-insensitively on lower(email)/lower(username)
+    __table_args__ = (
+        Index('ix_users_email_lower', func.lower(email)),
+        Index('ix_users_username_lower', func.lower(username)),
+    )
+
     def set_password(self, password):
-        """Hash and set the user's password"""
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        """Hash and set the user's password (argon2id)"""
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        """Verify the user's password"""
-        return bcrypt.check_password_hash(self.password_hash, password)
+        """
+        Verify the user's password. Legacy bcrypt hashes and argon2 hashes with
+        outdated parameters are re-hashed on success; the caller commits.
+        """
+        if self.password_hash.startswith('$2'):
+            if not bcrypt.check_password_hash(self.password_hash, password):
+                return False
+            self.set_password(password)
+            return True
+
+        try:
+            password_hasher.verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+        if password_hasher.check_needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
     
     def to_dict(self):
         """Convert user object to dictionary (exclude password)"""
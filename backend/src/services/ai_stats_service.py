@@ -1,19 +1,28 @@
 import os
 import json
 import logging
-import hashlib
+import threading
 import time
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from concurrent.futures import ThreadPoolExecutor
+from cachetools import LRUCache, TTLCache
+import orjson
 
 logger = logging.getLogger(__name__)
 
-# In-memory caches
-_scorers_cache: dict = {}    # {cache_key: data}  — permanent for finished matches
-_stats_cache:   dict = {}    # {cache_key: data}
-_key_cooldown:  dict = {}    # {api_key: cooldown_until_timestamp}
-
 MAX_CACHE_SIZE = 300
+SHARED_CACHE_TTL = 86400
+MISS_CACHE_TTL = 600
+# Finished matches older than this are left to the source API
+STALE_MATCH_AGE = timedelta(hours=72)
+
+_json_decoder = json.JSONDecoder()
+
+# In-memory LRU caches
+_scorers_cache = LRUCache(maxsize=MAX_CACHE_SIZE)  # {cache_key: data}  — permanent for finished matches
+_stats_cache   = LRUCache(maxsize=MAX_CACHE_SIZE)  # {cache_key: data}
+_miss_cache    = TTLCache(maxsize=MAX_CACHE_SIZE, ttl=MISS_CACHE_TTL)  # keys Gemini had no answer for
+_key_cooldown:  dict = {}    # {api_key: cooldown_until_timestamp}
 
 try:
     from src.services.api_football_service import APIFootballService
@@ -28,6 +37,113 @@ try:
 except Exception:
     _gemini_available = False
 
+# Shared pool for Gemini lookups: caps concurrent AI calls across all requests
+# and lets enrich_match_data's result(timeout=...) actually bound its wait.
+_enrich_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ai-enrich")
+
+# LRUCache reorders on every read, so access from enrichment threads is locked
+_cache_lock = threading.Lock()
+
+
+def _cache_get(cache, ck):
+    with _cache_lock:
+        return cache.get(ck)
+
+
+def _cache_put(cache, ck, data):
+    with _cache_lock:
+        cache[ck] = data
+
+
+def _is_miss(ck):
+    with _cache_lock:
+        return ck in _miss_cache
+
+
+def _record_miss(ck):
+    with _cache_lock:
+        _miss_cache[ck] = True
+
+# Optional Redis layer so every worker (and restarts) share Gemini results
+_shared_cache = None
+if os.getenv("REDIS_URL"):
+    try:
+        import redis
+        _shared_cache = redis.Redis.from_url(os.getenv("REDIS_URL"), socket_timeout=0.5)
+    except Exception:
+        _shared_cache = None
+
+
+def _shared_get(cache, ck):
+    """Look ck up in Redis on a local miss and promote the hit into cache."""
+    if _shared_cache is None:
+        return None
+    try:
+        raw = _shared_cache.get(f"aistats:{ck}")
+    except Exception as exc:
+        logger.warning("Shared AI cache read failed: %s", exc)
+        return None
+    if raw is None:
+        return None
+    try:
+        data = orjson.loads(raw)
+    except (ValueError, TypeError) as exc:
+        # A corrupt or truncated entry is just a miss
+        logger.warning("Shared AI cache entry %s is unreadable: %s", ck, exc)
+        return None
+    _cache_put(cache, ck, data)
+    return data
+
+
+def _shared_set(ck, data):
+    if _shared_cache is None:
+        return
+    try:
+        _shared_cache.setex(f"aistats:{ck}", SHARED_CACHE_TTL, orjson.dumps(data))
+    except Exception as exc:
+        logger.warning("Shared AI cache write failed: %s", exc)
+
+# One client per API key, reused so each call keeps the HTTP connection pool
+_clients: dict = {}          # {api_key: genai.Client}
+_clients_lock = threading.Lock()
+
+if _gemini_available:
+    _SAFETY_SETTINGS = [
+        types.SafetySetting(
+            category=types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
+            threshold=types.HarmBlockThreshold.BLOCK_ONLY_HIGH,
+        ),
+        types.SafetySetting(
+            category=types.HarmCategory.HARM_CATEGORY_HARASSMENT,
+            threshold=types.HarmBlockThreshold.BLOCK_ONLY_HIGH,
+        ),
+        types.SafetySetting(
+            category=types.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
+            threshold=types.HarmBlockThreshold.BLOCK_ONLY_HIGH,
+        ),
+        types.SafetySetting(
+            category=types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
+            threshold=types.HarmBlockThreshold.BLOCK_ONLY_HIGH,
+        )
+    ]
+    _SEARCH_CONFIG = types.GenerateContentConfig(
+        tools=[types.Tool(google_search=types.GoogleSearch())],
+        temperature=0.0,
+        safety_settings=_SAFETY_SETTINGS,
+    )
+    _PLAIN_CONFIG = types.GenerateContentConfig(temperature=0.4, safety_settings=_SAFETY_SETTINGS)
+
+
+def get_gemini_client(api_key: str):
+    """Return the shared genai.Client for api_key, creating it on first use."""
+    client = _clients.get(api_key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(api_key)
+            if client is None:
+                client = _clients[api_key] = genai.Client(api_key=api_key)
+    return client
+
 
 class AIStatsService:
     """
@@ -73,8 +189,19 @@ class AIStatsService:
 
     @staticmethod
     def _cache_key(*parts) -> str:
-        raw = "_".join(str(p).lower().strip() for p in parts)
-        return hashlib.sha256(raw.encode()).hexdigest()
+        # Parts are short team names/dates; the normalized string itself is the
+        # key, which also reads cleanly as a Redis key suffix.
+        return "|".join(str(p).lower().strip() for p in parts)
+
+    @staticmethod
+    def _is_stale(utc_date: str) -> bool:
+        try:
+            kickoff = datetime.fromisoformat(utc_date.replace("Z", "+00:00"))
+        except ValueError:
+            return False
+        if kickoff.tzinfo is None:
+            kickoff = kickoff.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - kickoff > STALE_MATCH_AGE
 
     @staticmethod
     def _parse_json(text: str) -> dict | None:
@@ -84,12 +211,14 @@ class AIStatsService:
         if t.startswith("```"):
             t = "\n".join(l for l in t.split("\n") if not l.strip().startswith("```"))
         try:
-            return json.loads(t)
-        except json.JSONDecodeError:
-            s, e = t.find("{"), t.rfind("}") + 1
-            if s >= 0 and e > s:
+            return orjson.loads(t)
+        except orjson.JSONDecodeError:
+            # Prose around the object: decode from the first '{' and stop at
+            # the end of that object instead of slicing to the last '}'.
+            start = t.find("{")
+            if start >= 0:
                 try:
-                    return json.loads(t[s:e])
+                    return _json_decoder.raw_decode(t, start)[0]
                 except json.JSONDecodeError:
                     pass
         logger.error("Could not parse JSON from Gemini: %.300s", text)
@@ -112,30 +241,8 @@ class AIStatsService:
 
         for i, api_key in enumerate(keys):
             try:
-                client = genai.Client(api_key=api_key)
-                safety_settings = [
-                    types.SafetySetting(
-                        category=types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
-                        threshold=types.HarmBlockThreshold.BLOCK_ONLY_HIGH,
-                    ),
-                    types.SafetySetting(
-                        category=types.HarmCategory.HARM_CATEGORY_HARASSMENT,
-                        threshold=types.HarmBlockThreshold.BLOCK_ONLY_HIGH,
-                    ),
-                    types.SafetySetting(
-                        category=types.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
-                        threshold=types.HarmBlockThreshold.BLOCK_ONLY_HIGH,
-                    ),
-                    types.SafetySetting(
-                        category=types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
-                        threshold=types.HarmBlockThreshold.BLOCK_ONLY_HIGH,
-                    )
-                ]
-                if use_search:
-                    tool   = types.Tool(google_search=types.GoogleSearch())
-                    config = types.GenerateContentConfig(tools=[tool], temperature=0.0, safety_settings=safety_settings)
-                else:
-                    config = types.GenerateContentConfig(temperature=0.4, safety_settings=safety_settings)
+                client = get_gemini_client(api_key)
+                config = _SEARCH_CONFIG if use_search else _PLAIN_CONFIG
 
                 resp = client.models.generate_content(
                     model="gemini-2.0-flash",
@@ -177,14 +284,16 @@ class AIStatsService:
         Results are permanently cached for finished matches.
         """
         ck = AIStatsService._cache_key(home_team, away_team, match_date, "scorers")
-        if ck in _scorers_cache:
-            entry = _scorers_cache[ck]
+        entry = _cache_get(_scorers_cache, ck) or _shared_get(_scorers_cache, ck)
+        if entry is not None:
             if isinstance(entry, dict) and entry.get("_cooldown_until"):
                 if time.time() < entry["_cooldown_until"]:
                     return None
             else:
                 logger.info("Scorer cache hit: %s vs %s", home_team, away_team)
                 return entry
+        if _is_miss(ck):
+            return None
 
         if not AIStatsService._available_keys():
             logger.info("No available Gemini keys – skipping scorer lookup")
@@ -211,16 +320,17 @@ class AIStatsService:
         raw_text = AIStatsService._gemini_call(prompt, use_search=True)
         if not raw_text:
             logger.error("Gemini scorers fetch failed: %s", raw_text)
-            _scorers_cache[ck] = {"_cooldown_until": time.time() + 120}
+            _cache_put(_scorers_cache, ck, {"_cooldown_until": time.time() + 120})
             return None
 
         data = AIStatsService._parse_json(raw_text)
 
         if data:
-            if len(_scorers_cache) >= MAX_CACHE_SIZE:
-                _scorers_cache.pop(next(iter(_scorers_cache)))
-            _scorers_cache[ck] = data
+            _cache_put(_scorers_cache, ck, data)
+            _shared_set(ck, data)
             logger.info("Scorer data cached for %s vs %s", home_team, away_team)
+        else:
+            _record_miss(ck)
 
         return data
 
@@ -231,13 +341,15 @@ class AIStatsService:
             return None
 
         ck = AIStatsService._cache_key(home_team, away_team, match_date, "fullstats")
-        if ck in _stats_cache:
-            entry = _stats_cache[ck]
+        entry = _cache_get(_stats_cache, ck) or _shared_get(_stats_cache, ck)
+        if entry is not None:
             if isinstance(entry, dict) and entry.get("_cooldown_until"):
                 if time.time() < entry["_cooldown_until"]:
                     return None
             else:
                 return entry
+        if _is_miss(ck):
+            return None
 
         prompt = (
             f"Find match statistics for {home_team} vs {away_team} "
@@ -251,15 +363,15 @@ class AIStatsService:
         )
         raw  = AIStatsService._gemini_call(prompt, use_search=True)
         if not raw:
-            _stats_cache[ck] = {"_cooldown_until": time.time() + 120}
+            _cache_put(_stats_cache, ck, {"_cooldown_until": time.time() + 120})
             return None
 
         data = AIStatsService._parse_json(raw)
         if data and "statistics" in data:
-            if len(_stats_cache) >= MAX_CACHE_SIZE:
-                _stats_cache.pop(next(iter(_stats_cache)))
-            _stats_cache[ck] = data
+            _cache_put(_stats_cache, ck, data)
+            _shared_set(ck, data)
             return data
+        _record_miss(ck)
         return None
 
     @staticmethod
@@ -314,33 +426,36 @@ class AIStatsService:
         need_scorers = not native_goals and total_goals > 0 and home_short and away_short
         need_stats   = not match_data.get("homeTeam", {}).get("statistics")
 
+        # Old finished matches: the source API has whatever it will ever have
+        if status == "FINISHED" and AIStatsService._is_stale(utc_date):
+            need_scorers = need_stats = False
+
         scorer_data = None
         ai_stats    = None
 
         if need_scorers or need_stats:
-            with ThreadPoolExecutor(max_workers=2) as pool:
-                scorer_future = (
-                    pool.submit(AIStatsService.get_goal_scorers,
-                                home_short, away_short, match_date, sh, sa)
-                    if need_scorers else None
-                )
-                stats_future = (
-                    pool.submit(AIStatsService.get_match_stats,
-                                home_short, away_short, match_date, sh, sa)
-                    if need_stats else None
-                )
-
-                if scorer_future:
-                    try:
-                        scorer_data = scorer_future.result(timeout=15)
-                    except Exception as e:
-                        logger.error("Gemini scorers fetch failed: %s", e)
+            scorer_future = (
+                _enrich_pool.submit(AIStatsService.get_goal_scorers,
+                                    home_short, away_short, match_date, sh, sa)
+                if need_scorers else None
+            )
+            stats_future = (
+                _enrich_pool.submit(AIStatsService.get_match_stats,
+                                    home_short, away_short, match_date, sh, sa)
+                if need_stats else None
+            )
+
+            if scorer_future:
+                try:
+                    scorer_data = scorer_future.result(timeout=15)
+                except Exception as e:
+                    logger.error("Gemini scorers fetch failed: %s", e)
 
-                if stats_future:
-                    try:
-                        ai_stats = stats_future.result(timeout=15)
-                    except Exception as e:
-                        logger.error("Gemini stats fetch failed: %s", e)
+            if stats_future:
+                try:
+                    ai_stats = stats_future.result(timeout=15)
+                except Exception as e:
+                    logger.error("Gemini stats fetch failed: %s", e)
 
         # Process scorer results (Step 1)
         if scorer_data:
@@ -439,9 +554,11 @@ class AIStatsService:
 
     @staticmethod
     def clear_cache():
-        count = len(_stats_cache) + len(_scorers_cache)
-        _stats_cache.clear()
-        _scorers_cache.clear()
+        with _cache_lock:
+            count = len(_stats_cache) + len(_scorers_cache)
+            _stats_cache.clear()
+            _scorers_cache.clear()
+            _miss_cache.clear()
         _key_cooldown.clear()
         return count
 
@@ -4,27 +4,44 @@ from sqlalchemy import func
 from src.db.models.user import User
 import re
 
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 class AuthService:
     @staticmethod
     def validate_email(email):
         """Validate email format"""
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
+        return _EMAIL_RE.match(email) is not None
 
     @staticmethod
     def validate_password(password):
         """
         Validate password strength
-        At least 8 characters, 1 uppercase, 1 lowercase, 1 number
+        At least 8 characters, 1 number, 1 uppercase, 1 lowercase.
+        Checks run cheapest first and stop at the first failure.
         """
         if len(password) < 8:
             return False, "Password must be at least 8 characters long"
-        if not re.search(r'[A-Z]', password):
+        # One pass over the password; lowercase letters are the most frequent
+        # characters, so they are tested first
+        has_upper = has_lower = has_digit = False
+        for ch in password:
+            if 'a' <= ch <= 'z':
+                has_lower = True
+            elif 'A' <= ch <= 'Z':
+                has_upper = True
+            elif ch.isdecimal():
+                has_digit = True
+            else:
+                continue
+            if has_upper and has_lower and has_digit:
+                break
+        # Weak passwords most often lack a digit, then an uppercase letter
+        if not has_digit:
+            return False, "Password must contain at least one number"
+        if not has_upper:
             return False, "Password must contain at least one uppercase letter"
-        if not re.search(r'[a-z]', password):
+        if not has_lower:
             return False, "Password must contain at least one lowercase letter"
-        if not re.search(r'\d', password):
-            return False, "Password must contain at least one number"
         return True, "Password is valid"
 
     @staticmethod
@@ -95,7 +112,8 @@ class AuthService:
         if not user:
             return False, "Invalid credentials", None, None
 
-        # Check if user is banned
+        # Banned/inactive accounts are rejected before the deliberately slow
+        # password hash runs, so brute-forcing them costs no hashing CPU
         if user.is_banned:
             return False, "Your account has been banned", None, None
 
@@ -104,9 +122,17 @@ class AuthService:
             return False, "Your account is inactive", None, None
 
         # Verify password
+        stored_hash = user.password_hash
         if not user.check_password(password):
             return False, "Invalid credentials", None, None
 
+        # Persist a transparently upgraded hash
+        if user.password_hash != stored_hash:
+            try:
+                db.commit()
+            except Exception:
+                db.rollback()
+
         # Generate JWT tokens
         try:
             access_token = create_access_token(identity=str(user.id))
@@ -0,0 +1,117 @@
+import threading
+from collections import namedtuple
+
+from cachetools import TTLCache
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from src.db.models.community_member import CommunityMember
+from src.db.models.user import User
+
+# Lightweight snapshots of the rows the Socket.IO handlers read on every event.
+CachedUser = namedtuple("CachedUser", ["id", "username", "avatar_url", "is_banned"])
+CachedMembership = namedtuple("CachedMembership", ["role", "muted_until"])
+
+# Socket handlers run concurrently, so every cache access goes through the lock.
+_user_cache = TTLCache(maxsize=5000, ttl=60)        # {user_id: CachedUser | None}
+_membership_cache = TTLCache(maxsize=20000, ttl=60)  # {(user_id, community_id): CachedMembership | None}
+_lock = threading.RLock()
+_MISSING = object()
+
+
+class ChatCacheService:
+    """
+    Short-lived, in-process cache of user and membership lookups used by the
+    chat socket handlers. Writers (community/auth services) must invalidate
+    the affected entries after committing a change.
+    """
+
+    @staticmethod
+    def get_user(db: Session, user_id):
+        """Return a CachedUser for user_id, or None if the user does not exist"""
+        with _lock:
+            cached = _user_cache.get(user_id, _MISSING)
+        if cached is not _MISSING:
+            return cached
+
+        user = db.query(User).filter(User.id == user_id).first()
+        cached = CachedUser(user.id, user.username, user.avatar_url, bool(user.is_banned)) if user else None
+        with _lock:
+            _user_cache[user_id] = cached
+        return cached
+
+    @staticmethod
+    def get_membership(db: Session, user_id, community_id):
+        """Return a CachedMembership, or None if the user is not a member"""
+        key = (user_id, community_id)
+        with _lock:
+            cached = _membership_cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+
+        member = db.query(CommunityMember.role, CommunityMember.muted_until).filter_by(
+            user_id=user_id,
+            community_id=community_id
+        ).first()
+        cached = CachedMembership(*member) if member else None
+        with _lock:
+            _membership_cache[key] = cached
+        return cached
+
+    @staticmethod
+    def get_user_and_membership(db: Session, user_id, community_id):
+        """
+        Return (CachedUser | None, CachedMembership | None) for a user in a
+        community, fetching whatever is not cached with a single joined query
+        """
+        key = (user_id, community_id)
+        with _lock:
+            user = _user_cache.get(user_id, _MISSING)
+            member = _membership_cache.get(key, _MISSING)
+        if user is not _MISSING and member is not _MISSING:
+            return user, member
+
+        row = db.execute(
+            select(
+                User.id, User.username, User.avatar_url, User.is_banned,
+                CommunityMember.id.label("member_id"), CommunityMember.role, CommunityMember.muted_until
+            )
+            .outerjoin(CommunityMember, and_(
+                CommunityMember.user_id == User.id,
+                CommunityMember.community_id == community_id
+            ))
+            .where(User.id == user_id)
+        ).first()
+
+        user = CachedUser(row.id, row.username, row.avatar_url, bool(row.is_banned)) if row else None
+        member = CachedMembership(row.role, row.muted_until) if row and row.member_id is not None else None
+        with _lock:
+            _user_cache[user_id] = user
+            _membership_cache[key] = member
+        return user, member
+
+    @staticmethod
+    def is_member(db: Session, user_id, community_id):
+        """
+        Check if user is a member of community. Only positive entries are
+        trusted: a cached "not a member" may predate a join handled by another
+        worker, so it is re-checked against the database.
+        """
+        key = (user_id, community_id)
+        with _lock:
+            cached = _membership_cache.get(key)
+            if cached is None:
+                _membership_cache.pop(key, None)
+        if cached is not None:
+            return True
+        return ChatCacheService.get_membership(db, user_id, community_id) is not None
+
+    @staticmethod
+    def invalidate_user(user_id):
+        with _lock:
+            _user_cache.pop(int(user_id), None)
+
+    @staticmethod
+    def invalidate_membership(user_id, community_id):
+        with _lock:
+            _membership_cache.pop((int(user_id), int(community_id)), None)
@@ -1,9 +1,36 @@
-from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 from src.db.models.community import Community
 from src.db.models.community_member import CommunityMember
 from src.db.models.user import User
 from src.db.models.new_models import CommunityBan
+from src.services.chat_cache_service import ChatCacheService
+
+# Columns served by the community list endpoints (same shape as Community.to_dict)
+_LIST_COLUMNS = (
+    Community.id,
+    Community.name,
+    Community.description,
+    Community.club_name,
+    Community.is_public,
+    Community.member_count,
+    Community.created_at,
+)
+
+def _list_rows(result):
+    """Turn a column-only result into plain dicts without hydrating ORM objects"""
+    return [
+        {**row, 'created_at': row['created_at'].isoformat() if row['created_at'] else None}
+        for row in result.mappings()
+    ]
+
+def _bump_member_count(db, community_id, delta):
+    """Adjust Community.member_count in SQL inside the caller's transaction (never below zero)"""
+    stmt = update(Community).where(Community.id == community_id)
+    if delta < 0:
+        stmt = stmt.where(Community.member_count >= -delta)
+    db.execute(stmt.values(member_count=Community.member_count + delta))
 
 class CommunityService:
     VALID_ROLES = {'member', 'moderator', 'admin'}
@@ -36,6 +63,7 @@ class CommunityService:
             db.add(member)
             db.commit()
             db.refresh(community)
+            ChatCacheService.invalidate_membership(creator_id, community.id)
             return True, "Community created successfully", community
         except Exception as e:
             db.rollback()
@@ -43,8 +71,9 @@ class CommunityService:
     
     @staticmethod
     def get_all_communities(db: Session):
-        """Get all public communities"""
-        return db.query(Community).filter(Community.is_public.is_(True)).all()
+        """Get all public communities as plain dicts"""
+        result = db.execute(select(*_LIST_COLUMNS).where(Community.is_public.is_(True)))
+        return _list_rows(result)
     
     @staticmethod
     def get_community_by_id(db: Session, community_id):
@@ -62,27 +91,21 @@ class CommunityService:
         if ban:
             return False, f"You are banned from this community. Reason: {ban.reason or 'No reason provided'}"
 
-        # Check if already a member
-        existing = db.query(CommunityMember).filter_by(
-            user_id=user_id,
-            community_id=community_id
-        ).first()
-        
-        if existing:
-            return False, "Already a member of this community"
-        
         try:
-            # Add member
-            member = CommunityMember(user_id=user_id, community_id=community_id)
-            db.add(member)
-            
-            # Increment member count
-            community = db.get(Community, community_id)
-            if community:
-                community.member_count += 1
-            
+            # The (user_id, community_id) unique constraint rejects duplicate joins
+            db.add(CommunityMember(user_id=user_id, community_id=community_id))
+            db.flush()
+            _bump_member_count(db, community_id, 1)
             db.commit()
+            ChatCacheService.invalidate_membership(user_id, community_id)
             return True, "Successfully joined community"
+        except IntegrityError as e:
+            db.rollback()
+            # Only the failure path pays for telling a duplicate join apart
+            # from other violations (e.g. a community that does not exist)
+            if CommunityService.is_member(db, user_id, community_id):
+                return False, "Already a member of this community"
+            return False, f"Error joining community: {str(e)}"
         except Exception as e:
             db.rollback()
             return False, f"Error joining community: {str(e)}"
@@ -101,12 +124,10 @@ class CommunityService:
         try:
             db.delete(member)
             
-            # Decrement member count
-            community = db.get(Community, community_id)
-            if community and community.member_count > 0:
-                community.member_count -= 1
+            _bump_member_count(db, community_id, -1)
             
             db.commit()
+            ChatCacheService.invalidate_membership(user_id, community_id)
             return True, "Successfully left community"
         except Exception as e:
             db.rollback()
@@ -115,48 +136,51 @@ class CommunityService:
     @staticmethod
     def is_member(db: Session, user_id, community_id):
         """Check if user is a member of community"""
-        member = db.query(CommunityMember).filter_by(
-            user_id=user_id,
-            community_id=community_id
-        ).first()
-        return member is not None
+        return db.query(
+            exists().where(
+                CommunityMember.user_id == user_id,
+                CommunityMember.community_id == community_id
+            )
+        ).scalar()
     
     @staticmethod
     def get_user_communities(db: Session, user_id):
-        """Get all communities user is a member of"""
-        memberships = (
-            db.query(CommunityMember)
-            .options(joinedload(CommunityMember.community))
-            .filter_by(user_id=user_id)
-            .all()
+        """Get all communities user is a member of as plain dicts"""
+        result = db.execute(
+            select(*_LIST_COLUMNS)
+            .join(CommunityMember, CommunityMember.community_id == Community.id)
+            .where(CommunityMember.user_id == user_id)
         )
-        return [m.community for m in memberships]
+        return _list_rows(result)
  
     @staticmethod
     def get_community_members(db: Session, community_id):
         """Get members of a community with public profile and role details"""
-        memberships = (
-            db.query(CommunityMember)
-            .options(joinedload(CommunityMember.user))
-            .filter(CommunityMember.community_id == community_id)
+        result = db.execute(
+            select(
+                User.id.label("user_id"),
+                User.username,
+                User.avatar_url,
+                User.favorite_club,
+                CommunityMember.role,
+                CommunityMember.joined_at,
+                CommunityMember.muted_until,
+                CommunityMember.warnings_count,
+            )
+            .join(User, User.id == CommunityMember.user_id)
+            .where(CommunityMember.community_id == community_id)
             .order_by(CommunityMember.joined_at.asc())
-            .all()
         )
 
-        members = []
-        for membership in memberships:
-            members.append({
-                "user_id": membership.user.id,
-                "username": membership.user.username,
-                "avatar_url": membership.user.avatar_url,
-                "favorite_club": membership.user.favorite_club,
-                "role": membership.role,
-                "joined_at": membership.joined_at.isoformat() if membership.joined_at else None,
-                "muted_until": membership.muted_until.isoformat() if membership.muted_until else None,
-                "warnings_count": membership.warnings_count or 0
-            })
-
-        return members
+        return [
+            {
+                **row,
+                "joined_at": row["joined_at"].isoformat() if row["joined_at"] else None,
+                "muted_until": row["muted_until"].isoformat() if row["muted_until"] else None,
+                "warnings_count": row["warnings_count"] or 0
+            }
+            for row in result.mappings()
+        ]
 
     @staticmethod
     def get_membership(db: Session, user_id, community_id):
@@ -184,10 +208,10 @@ class CommunityService:
             return False, "Target user is not a member of this community", 404
 
         # Query admin count once for both checks below
-        admin_count = db.query(CommunityMember).filter_by(
+        admin_count = db.query(func.count(CommunityMember.id)).filter_by(
             community_id=community_id,
             role='admin'
-        ).count()
+        ).scalar()
 
         if target_membership.user_id == actor_user_id and role != 'admin':
             if admin_count <= 1:
@@ -200,6 +224,7 @@ class CommunityService:
         try:
             target_membership.role = role
             db.commit()
+            ChatCacheService.invalidate_membership(target_user_id, community_id)
             return True, "Member role updated successfully", 200
         except Exception as e:
             db.rollback()
@@ -224,6 +249,8 @@ class CommunityService:
             actor_membership.role = 'moderator'
             
             db.commit()
+            ChatCacheService.invalidate_membership(actor_user_id, community_id)
+            ChatCacheService.invalidate_membership(target_user_id, community_id)
             return True, f"Ownership transferred to {target_membership.user.username}", 200
         except Exception as e:
             db.rollback()
@@ -262,11 +289,10 @@ class CommunityService:
             member = CommunityMember(user_id=target_user.id, community_id=community_id)
             db.add(member)
             
-            community = db.get(Community, community_id)
-            if community:
-                community.member_count += 1
+            _bump_member_count(db, community_id, 1)
             
             db.commit()
+            ChatCacheService.invalidate_membership(target_user.id, community_id)
             return True, f"Added {target_user.username} to the community", 201
         except Exception as e:
             db.rollback()
@@ -289,21 +315,20 @@ class CommunityService:
             return False, "Admins cannot remove themselves", 400
 
         if target_membership.role == 'admin':
-            admin_count = db.query(CommunityMember).filter_by(
+            admin_count = db.query(func.count(CommunityMember.id)).filter_by(
                 community_id=community_id,
                 role='admin'
-            ).count()
+            ).scalar()
             if admin_count <= 1:
                 return False, "Cannot remove the last admin", 400
 
         try:
             db.delete(target_membership)
 
-            community = db.get(Community, community_id)
-            if community and community.member_count > 0:
-                community.member_count -= 1
+            _bump_member_count(db, community_id, -1)
 
             db.commit()
+            ChatCacheService.invalidate_membership(target_user_id, community_id)
             return True, "Member removed successfully", 200
         except Exception as e:
             db.rollback()
@@ -329,6 +354,7 @@ class CommunityService:
         try:
             target_membership.muted_until = datetime.utcnow() + timedelta(minutes=duration_minutes)
             db.commit()
+            ChatCacheService.invalidate_membership(target_user_id, community_id)
             return True, f"User muted successfully for {duration_minutes} minutes", 200
         except Exception as e:
             db.rollback()
@@ -363,6 +389,7 @@ class CommunityService:
                 msg = f"User warned successfully. Warnings count: {target_membership.warnings_count}/3"
             
             db.commit()
+            ChatCacheService.invalidate_membership(target_user_id, community_id)
             return True, msg, 200, muted
         except Exception as e:
             db.rollback()
@@ -397,12 +424,10 @@ class CommunityService:
             # Delete membership
             db.delete(target_membership)
             
-            # Decrement member count
-            community = db.get(Community, community_id)
-            if community and community.member_count > 0:
-                community.member_count -= 1
+            _bump_member_count(db, community_id, -1)
 
             db.commit()
+            ChatCacheService.invalidate_membership(target_user_id, community_id)
             return True, "User banned successfully", 200
         except Exception as e:
             db.rollback()
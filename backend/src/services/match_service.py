@@ -3,8 +3,16 @@ import os
 import logging
 import time
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+from operator import itemgetter
 from datetime import datetime, timedelta
+from cachetools import TTLCache
+from cachetools.keys import hashkey
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError as ReqConnectionError, Timeout as ReqTimeout
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +22,65 @@ logger = logging.getLogger(__name__)
 CIRCUIT_BACKOFF_SECONDS = 60   # 1 minute (reduced from 5m)
 _circuit_open_until: float = 0  # epoch timestamp; 0 = closed (healthy)
 
+# Post-processed views of the raw API cache, so repeated reads skip the
+# filtering/grouping as well as the upstream call.
+_live_cache = TTLCache(maxsize=1, ttl=30)
+_grouped_cache = TTLCache(maxsize=1, ttl=30)
+_competitions_cache = TTLCache(maxsize=1, ttl=300)
+_view_lock = threading.Lock()
+
+
+class _FallbackResponse(dict):
+    """Empty placeholder served when the upstream API is unavailable"""
+
+
+def _cached_view(cache):
+    """Like cachetools.cached, but a degraded fallback result is never memoized"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args):
+            key = hashkey(*args)
+            with _view_lock:
+                hit = cache.get(key)
+            if hit is not None:
+                return hit
+            result = func(*args)
+            if not isinstance(result, _FallbackResponse):
+                with _view_lock:
+                    cache[key] = result
+            return result
+        return wrapper
+    return decorator
+
+# Raw upstream responses keyed on (endpoint, params). Match lists go stale
+# within a minute; the competition list changes at most daily.
+_response_caches = {
+    "matches": TTLCache(maxsize=256, ttl=60),
+    "competitions": TTLCache(maxsize=1, ttl=86400),
+    "default": TTLCache(maxsize=256, ttl=300),
+}
+_response_lock = threading.Lock()
+
+# Lets callers overlap an upstream fetch with their own DB work
+_fetch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="match-fetch")
+
+
+def _response_cache_for(endpoint, params):
+    if endpoint == "/competitions":
+        return _response_caches["competitions"]
+    if "/matches" in endpoint or (params and params.get("status") == "LIVE"):
+        return _response_caches["matches"]
+    return _response_caches["default"]
+
+# One pooled session for football-data.org so calls reuse the TLS connection.
+# 429s are left to _make_request, which rotates keys on them.
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504), allowed_methods=frozenset({"GET"})),
+))
+
 # SportsDB service removed
 
 # Mapping of common club names to football-data.org team IDs
@@ -109,6 +176,52 @@ TEAM_NAME_TO_ID = {
     "atalanta bc": 102,
 }
 
+# Partial names ("ars", "madrid") resolve to the shortest known name that
+# contains them, with ties broken alphabetically so dict order never matters
+_TEAM_ITEMS_SHORTEST_FIRST = tuple(sorted(TEAM_NAME_TO_ID.items(), key=lambda item: (len(item[0]), item[0])))
+
+# Optional Aho-Corasick automaton: finds every known name inside the input
+# in one pass instead of testing each key with `in`
+try:
+    import ahocorasick
+    _TEAM_AUTOMATON = ahocorasick.Automaton()
+    for _key, _team_id in TEAM_NAME_TO_ID.items():
+        _TEAM_AUTOMATON.add_word(_key, (len(_key), _team_id))
+    _TEAM_AUTOMATON.make_automaton()
+except Exception:
+    _TEAM_AUTOMATON = None
+
+
+def _parse_utc_date(value):
+    """Parse a football-data.org utcDate ("2024-05-01T19:00:00Z") as a naive UTC datetime"""
+    if value.endswith("Z"):
+        value = value[:-1]
+    return datetime.fromisoformat(value)
+
+
+@lru_cache(maxsize=1024)
+def _lookup_team_id(norm):
+    if norm in TEAM_NAME_TO_ID:
+        return TEAM_NAME_TO_ID[norm]
+    # Longest known name contained in the input ("manchester united fc");
+    # both branches rank hits by (length, team id)
+    if _TEAM_AUTOMATON is not None:
+        best = max((hit for _, hit in _TEAM_AUTOMATON.iter(norm)), default=None)
+    else:
+        best = max(((len(k), team_id) for k, team_id in TEAM_NAME_TO_ID.items() if k in norm), default=None)
+    if best:
+        return best[1]
+    # Input is a fragment of a known name ("ars" for "arsenal"): prefer names
+    # where it starts a word, so "real" is Real Madrid rather than Villarreal
+    fallback = None
+    for k, team_id in _TEAM_ITEMS_SHORTEST_FIRST:
+        if norm in k:
+            if k.startswith(norm) or f" {norm}" in k:
+                return team_id
+            if fallback is None:
+                fallback = team_id
+    return fallback
+
 
 class MatchService:
     """
@@ -123,7 +236,6 @@ class MatchService:
     API_KEYS = [k.strip() for k in _raw_keys.split(",") if k.strip()]
     
     _current_key_idx = 0
-    _cache = {}
     _team_profile_cache = {}
     _key_cooldowns = {} # Stores (timestamp) when a key was rate limited
     
@@ -157,13 +269,14 @@ class MatchService:
         """Move to the next available API key."""
         if len(MatchService.API_KEYS) > 1:
             MatchService._current_key_idx = (MatchService._current_key_idx + 1) % len(MatchService.API_KEYS)
-            logger.info(f"Rotating to API key index: {MatchService._current_key_idx}")
+            logger.info("Rotating to API key index: %d", MatchService._current_key_idx)
 
     @staticmethod
-    def _make_request(endpoint, params=None, retries=None):
+    def _make_request(endpoint, params=None, retries=None, use_cache=True):
         """
         Make HTTP request with key rotation, throttling, and a circuit-breaker
         that silences log spam when the network is unavailable.
+        use_cache=False always goes upstream (the fresh response is still cached).
         """
         global _circuit_open_until
 
@@ -175,8 +288,8 @@ class MatchService:
         now = time.time()
         if now < _circuit_open_until:
             logger.debug(
-                "Football API circuit open – skipping request (backoff expires in "
-                f"{int(_circuit_open_until - now)}s): {endpoint}"
+                "Football API circuit open – skipping request (backoff expires in %ds): %s",
+                _circuit_open_until - now, endpoint
             )
             return MatchService._get_empty_response(endpoint)
 
@@ -184,16 +297,14 @@ class MatchService:
         if retries is None:
             retries = max(1, len(MatchService.API_KEYS))
 
-        cache_key = f"{endpoint}_{json.dumps(params, sort_keys=True)}"
+        cache_key = (endpoint, json.dumps(params, sort_keys=True))
+        cache = _response_cache_for(endpoint, params)
 
         # ── Cache check ──
-        is_matches    = "/matches" in endpoint
-        is_live_filter = params and params.get("status") == "LIVE"
-        ttl = 60 if (is_matches or is_live_filter) else 300
-
-        if cache_key in MatchService._cache:
-            cache_time, cache_data = MatchService._cache[cache_key]
-            if now - cache_time < ttl:
+        if use_cache:
+            with _response_lock:
+                cache_data = cache.get(cache_key)
+            if cache_data is not None:
                 return cache_data
 
         attempt = 0
@@ -203,13 +314,14 @@ class MatchService:
             headers = {"X-Auth-Token": api_key, "Content-Type": "application/json"}
 
             try:
-                response = requests.get(url, headers=headers, params=params, timeout=30)
+                logger.debug("Requesting %s params=%s", url, params)
+                response = _http.get(url, headers=headers, params=params, timeout=30)
 
                 if response.status_code == 429:
                     reset_time = int(response.headers.get("X-RequestCounter-Reset", 60))
                     logger.warning(
-                        f"Rate limited on key index {MatchService._current_key_idx}. "
-                        f"Cooling down for {reset_time}s."
+                        "Rate limited on key index %d. Cooling down for %ds.",
+                        MatchService._current_key_idx, reset_time
                     )
                     MatchService._key_cooldowns[api_key] = time.time() + reset_time
                     MatchService._rotate_key()
@@ -221,11 +333,8 @@ class MatchService:
                 # ── Success: reset circuit, cache and return ──
                 _circuit_open_until = 0
                 data = response.json()
-                MatchService._cache[cache_key] = (time.time(), data)
-
-                if len(MatchService._cache) > 500:
-                    oldest = min(MatchService._cache, key=lambda k: MatchService._cache[k][0])
-                    del MatchService._cache[oldest]
+                with _response_lock:
+                    cache[cache_key] = data
 
                 return data
 
@@ -233,16 +342,17 @@ class MatchService:
                 # ── Network / DNS error: open circuit, log ONCE, bail out fast ──
                 _circuit_open_until = time.time() + CIRCUIT_BACKOFF_SECONDS
                 logger.error(
-                    f"Football API unreachable – circuit opened for {CIRCUIT_BACKOFF_SECONDS}s. "
-                    f"Error: {type(e).__name__}. Requests will be silenced until network recovers."
+                    "Football API unreachable – circuit opened for %ds. "
+                    "Error: %s. Requests will be silenced until network recovers.",
+                    CIRCUIT_BACKOFF_SECONDS, type(e).__name__
                 )
                 return MatchService._get_empty_response(endpoint)
 
             except requests.exceptions.RequestException as e:
                 # ── Other HTTP errors (4xx/5xx): log and try next key ──
                 logger.warning(
-                    f"Football API error on key index {MatchService._current_key_idx}: "
-                    f"{type(e).__name__} – {e}"
+                    "Football API error on key index %d: %s – %s",
+                    MatchService._current_key_idx, type(e).__name__, e
                 )
                 if attempt < retries - 1:
                     MatchService._rotate_key()
@@ -256,12 +366,18 @@ class MatchService:
     @staticmethod
     def _get_empty_response(endpoint):
         if "/competitions" in endpoint:
-            if "standings" in endpoint: return {"standings": []}
-            return {"count": 0, "competitions": []}
-        if "/matches" in endpoint: return {"count": 0, "matches": []}
-        return {}
+            if "standings" in endpoint: return _FallbackResponse(standings=[])
+            return _FallbackResponse(count=0, competitions=[])
+        if "/matches" in endpoint: return _FallbackResponse(count=0, matches=[])
+        return _FallbackResponse()
+
+    @staticmethod
+    def is_fallback(data):
+        """True when data is an empty placeholder for a failed upstream call"""
+        return isinstance(data, _FallbackResponse)
     
     @staticmethod
+    @_cached_view(_live_cache)
     def get_live_matches():
         today = datetime.now().strftime("%Y-%m-%d")
         params = {"dateFrom": today, "dateTo": today}
@@ -271,24 +387,31 @@ class MatchService:
         return {"count": len(live), "matches": live} if live else data
     
     @staticmethod
+    @_cached_view(_grouped_cache)
     def get_todays_matches_grouped():
         today = datetime.now().strftime("%Y-%m-%d")
         data = MatchService._make_request("/matches", {"dateFrom": today, "dateTo": today})
         all_matches = data.get("matches", [])
-        groups = {}
+        groups = {}  # {competition_id: (competition_name, group)}
         for match in all_matches:
             comp = match.get("competition", {})
             cid = comp.get("id", 0)
-            if cid not in groups: groups[cid] = {"competition": comp, "matches": []}
-            groups[cid]["matches"].append(match)
-        return {"count": len(all_matches), "grouped_matches": sorted(groups.values(), key=lambda g: g["competition"].get("name", ""))}
+            entry = groups.get(cid)
+            if entry is None:
+                entry = groups[cid] = (comp.get("name", ""), {"competition": comp, "matches": []})
+            entry[1]["matches"].append(match)
+        grouped = [group for _, group in sorted(groups.values(), key=itemgetter(0))]
+        result = {"count": len(all_matches), "grouped_matches": grouped}
+        return _FallbackResponse(result) if MatchService.is_fallback(data) else result
 
     @staticmethod
+    @_cached_view(_competitions_cache)
     def get_available_competitions():
         data = MatchService._make_request("/competitions")
         comps = data.get("competitions", [])
         filtered = [{"id": c.get("id"), "name": c.get("name"), "code": c.get("code"), "emblem": c.get("emblem"), "area": c.get("area", {})} for c in comps if c.get("id") and c.get("name")]
-        return {"count": len(filtered), "competitions": filtered}
+        result = {"count": len(filtered), "competitions": filtered}
+        return _FallbackResponse(result) if MatchService.is_fallback(data) else result
 
     @staticmethod
     def get_matches_by_date_range(date_from, date_to):
@@ -327,9 +450,48 @@ class MatchService:
     def get_competition_matches(competition_id, **params):
         return MatchService._make_request(f"/competitions/{competition_id}/matches", params)
     
+    # Last good standings per competition, kept warm by refresh_standings():
+    # {competition_id: (fetched_at, data)}, plus when each was last requested
+    _standings_snapshots: dict = {}
+    _standings_last_access: dict = {}
+    STANDINGS_MAX_AGE = 1800        # never serve a table older than this
+    STANDINGS_IDLE_TTL = 3600       # stop refreshing competitions nobody reads
+    STANDINGS_REFRESH_PER_RUN = 3   # stalest snapshots refreshed per run...
+    STANDINGS_REFRESH_SPACING = 6   # ...seconds apart, well inside the per-minute quota
+
     @staticmethod
     def get_competition_standings(competition_id):
-        return MatchService._make_request(f"/competitions/{competition_id}/standings")
+        now = time.time()
+        MatchService._standings_last_access[competition_id] = now
+        snapshot = MatchService._standings_snapshots.get(competition_id)
+        if snapshot is not None and now - snapshot[0] < MatchService.STANDINGS_MAX_AGE:
+            return snapshot[1]
+        data = MatchService._make_request(f"/competitions/{competition_id}/standings")
+        if data.get("standings"):
+            MatchService._standings_snapshots[competition_id] = (now, data)
+        return data
+
+    @staticmethod
+    def refresh_standings():
+        """
+        Re-fetch the stalest standings snapshots so the request path usually
+        reads one. Competitions not requested within STANDINGS_IDLE_TTL are
+        dropped; failed fetches keep the old snapshot until STANDINGS_MAX_AGE.
+        """
+        now = time.time()
+        for competition_id, last_access in list(MatchService._standings_last_access.items()):
+            if now - last_access > MatchService.STANDINGS_IDLE_TTL:
+                MatchService._standings_last_access.pop(competition_id, None)
+                MatchService._standings_snapshots.pop(competition_id, None)
+
+        stalest = sorted(MatchService._standings_snapshots.items(), key=lambda item: item[1][0])
+        for i, (competition_id, _) in enumerate(stalest[:MatchService.STANDINGS_REFRESH_PER_RUN]):
+            if i:
+                time.sleep(MatchService.STANDINGS_REFRESH_SPACING)
+            # Bypass the response cache, or a run could just re-read the same stale copy
+            data = MatchService._make_request(f"/competitions/{competition_id}/standings", use_cache=False)
+            if data.get("standings"):
+                MatchService._standings_snapshots[competition_id] = (time.time(), data)
     
     @staticmethod
     def get_team_matches(team_id, **params):
@@ -366,11 +528,12 @@ class MatchService:
     @staticmethod
     def _find_team_id(name):
         if not name: return None
-        norm = name.strip().lower()
-        if norm in TEAM_NAME_TO_ID: return TEAM_NAME_TO_ID[norm]
-        for k, v in TEAM_NAME_TO_ID.items():
-            if k in norm or norm in k: return v
-        return None
+        return _lookup_team_id(name.strip().lower())
+
+    @staticmethod
+    def submit_matches_for_team(team_name):
+        """Run get_matches_for_team in the background; returns a Future"""
+        return _fetch_pool.submit(MatchService.get_matches_for_team, team_name)
 
     @staticmethod
     def get_matches_for_team(team_name):
@@ -403,5 +566,6 @@ class MatchService:
             return {"count": 1, "matches": [latest_finished], "source": "closest"}
 
         # 3. Fallback to the closest match (likely upcoming)
-        closest = min(matches, key=lambda m: abs((datetime.strptime(m.get("utcDate", "").replace("Z",""), "%Y-%m-%dT%H:%M:%S") - now).total_seconds()))
+        now_ts = now.timestamp()
+        closest = min(matches, key=lambda m: abs(_parse_utc_date(m.get("utcDate", "")).timestamp() - now_ts))
         return {"count": 1, "matches": [closest], "source": "closest"}
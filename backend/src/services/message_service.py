@@ -1,8 +1,64 @@
-from sqlalchemy.orm import Session, joinedload
+from datetime import datetime
+from sqlalchemy import delete, exists, func, insert, literal, or_, select
+from sqlalchemy.orm import Session
 from src.db.models.message import Message
 from src.db.models.community_member import CommunityMember
+from src.db.models.user import User
+
+# Columns served by message history (same shape as Message.to_dict)
+_HISTORY_COLUMNS = (
+    Message.id,
+    Message.content,
+    Message.user_id,
+    User.username,
+    User.avatar_url,
+    Message.community_id,
+    Message.is_highlighted,
+    Message.is_pinned,
+    Message.media_url,
+    Message.media_description,
+    Message.created_at,
+)
+
+def _history_query(community_id):
+    return (
+        select(*_HISTORY_COLUMNS)
+        .outerjoin(User, User.id == Message.user_id)
+        .where(Message.community_id == community_id)
+    )
+
+def _history_rows(result):
+    """
+    Turn a column-only result into to_dict-shaped dicts without hydrating ORM
+    objects. Datetimes are left for the orjson response to format.
+    """
+    return [dict(row) for row in result.mappings()]
 
 class MessageService:
+    NOT_A_MEMBER = "You must be a member of this community to send messages"
+
+    @staticmethod
+    def new_message_payload(message_id, created_at, content, user_id, username, avatar_url,
+                            community_id, media_url=None, media_description=None, message_type='text'):
+        """
+        Build the client payload for a just-inserted message (same shape as
+        Message.to_dict plus message_type), shared by the socket and REST paths
+        """
+        return {
+            'id': message_id,
+            'content': content,
+            'user_id': user_id,
+            'username': username,
+            'avatar_url': avatar_url,
+            'community_id': community_id,
+            'is_highlighted': None,
+            'is_pinned': False,
+            'media_url': media_url,
+            'media_description': media_description,
+            'created_at': created_at.isoformat(),
+            'message_type': message_type
+        }
+
     @staticmethod
     def create_message(db: Session, content, user_id, community_id, is_highlighted=None, media_url=None, media_description=None):
         """Create a new message and save to database"""
@@ -23,18 +79,66 @@ class MessageService:
             db.rollback()
             return False, f"Error creating message: {str(e)}", None
     
+    @staticmethod
+    def create_member_message(db: Session, content, user_id, community_id):
+        """
+        Insert a message only if the author is a member of the community,
+        checked by the INSERT itself (no separate membership query).
+        Returns (success, msg, (id, created_at) or None)
+        """
+        try:
+            is_member = exists().where(
+                CommunityMember.user_id == user_id,
+                CommunityMember.community_id == community_id
+            )
+            # Column defaults are Python-side and not applied to INSERT ... SELECT
+            values = select(
+                literal(content), literal(user_id), literal(community_id),
+                literal(datetime.utcnow()), literal(False)
+            ).where(is_member)
+            saved = db.execute(
+                insert(Message)
+                .from_select(['content', 'user_id', 'community_id', 'created_at', 'is_pinned'], values)
+                .returning(Message.id, Message.created_at)
+            ).first()
+            db.commit()
+            if saved is None:
+                return False, MessageService.NOT_A_MEMBER, None
+            return True, "Message created successfully", saved
+        except Exception as e:
+            db.rollback()
+            return False, f"Error creating message: {str(e)}", None
+
+    @staticmethod
+    def create_messages(db: Session, rows):
+        """
+        Bulk-insert messages in a single statement and commit once.
+        rows is a list of dicts with Message column values; returns the
+        generated (id, created_at) pairs in the same order as rows.
+        """
+        try:
+            result = db.execute(
+                insert(Message).returning(Message.id, Message.created_at, sort_by_parameter_order=True),
+                rows
+            )
+            saved = result.all()
+            db.commit()
+            return True, "Messages created successfully", saved
+        except Exception as e:
+            db.rollback()
+            return False, f"Error creating messages: {str(e)}", []
+    
     @staticmethod
     def get_community_messages(db: Session, community_id, limit=50, offset=0):
         """
-        Get messages for a community with pagination
+        Get messages for a community with pagination, as plain dicts
         Returns oldest messages first (chronological order)
         """
         try:
-            messages = db.query(Message).filter(
-                Message.community_id == community_id
-            ).options(joinedload(Message.user)).order_by(Message.created_at.asc()).limit(limit).offset(offset).all()
-            
-            return messages
+            result = db.execute(
+                _history_query(community_id).order_by(Message.created_at.asc()).limit(limit).offset(offset)
+            )
+            return _history_rows(result)
         except Exception as e:
             print(f"Error fetching messages: {str(e)}")
             return []
@@ -43,25 +147,25 @@ class MessageService:
     def delete_message(db: Session, message_id, user_id):
         """Delete a message by author or community admin/moderator"""
         try:
-            message = db.query(Message).filter(
-                Message.id == message_id
-            ).first()
-            
-            if not message:
-                return False, "Message not found"
-            
-            # Allow author delete
-            if message.user_id != user_id:
-                # Also allow community admin/moderator delete
-                membership = db.query(CommunityMember).filter_by(
-                    user_id=user_id,
-                    community_id=message.community_id
-                ).first()
+            # Authorization is part of the DELETE: the author, or an
+            # admin/moderator of the message's community
+            can_moderate = exists().where(
+                CommunityMember.user_id == user_id,
+                CommunityMember.community_id == Message.community_id,
+                CommunityMember.role.in_(('admin', 'moderator'))
+            )
+            result = db.execute(
+                delete(Message)
+                .where(Message.id == message_id, or_(Message.user_id == user_id, can_moderate))
+                .execution_options(synchronize_session=False)
+            )
+
+            if result.rowcount == 0:
+                # Only the failure path pays for telling the two cases apart
+                if db.get(Message, message_id) is None:
+                    return False, "Message not found"
+                return False, "Unauthorized: only author or community admins/moderators can delete this message"
 
-                if not membership or membership.role not in ('admin', 'moderator'):
-                    return False, "Unauthorized: only author or community admins/moderators can delete this message"
-            
-            db.delete(message)
             db.commit()
             return True, "Message deleted successfully"
         except Exception as e:
@@ -99,14 +203,43 @@ class MessageService:
             db.rollback()
             return False, f"Error toggling highlight: {str(e)}", 500
 
+    @staticmethod
+    def get_community_messages_before(db: Session, community_id, before_id=None, limit=50):
+        """
+        Keyset page of the newest messages older than before_id (or the newest
+        overall when before_id is None), as plain dicts in chronological order
+        """
+        try:
+            query = _history_query(community_id)
+            if before_id is not None:
+                query = query.where(Message.id < before_id)
+            messages = _history_rows(db.execute(query.order_by(Message.id.desc()).limit(limit)))
+            messages.reverse()
+            return messages
+        except Exception as e:
+            print(f"Error fetching messages: {str(e)}")
+            return []
+
+    @staticmethod
+    def get_community_messages_after(db: Session, community_id, after_id, limit=50):
+        """
+        Keyset page of the oldest messages newer than after_id, as plain dicts
+        in chronological order (used to catch up after a reconnect)
+        """
+        try:
+            query = _history_query(community_id).where(Message.id > after_id)
+            return _history_rows(db.execute(query.order_by(Message.id.asc()).limit(limit)))
+        except Exception as e:
+            print(f"Error fetching messages: {str(e)}")
+            return []
+
     @staticmethod
     def get_message_count(db: Session, community_id):
         """Get total message count for a community"""
         try:
-            count = db.query(Message).filter(
+            return db.query(func.count(Message.id)).filter(
                 Message.community_id == community_id
-            ).count()
-            return count
+            ).scalar()
         except Exception as e:
             return 0
 
@@ -0,0 +1,45 @@
+import unittest
+from unittest import mock
+
+from src.services import match_service
+from src.services.match_service import _lookup_team_id
+
+ARSENAL, REAL_MADRID, ATLETICO, MAN_UTD, MARSEILLE = 57, 86, 78, 66, 516
+
+CASES = {
+    "arsenal": ARSENAL,
+    "ars": ARSENAL,
+    "arse": ARSENAL,
+    "madrid": REAL_MADRID,
+    "real": REAL_MADRID,
+    "atletico": ATLETICO,
+    "marseille": MARSEILLE,
+    "manchester united fc": MAN_UTD,
+    "united": MAN_UTD,
+}
+
+
+class TeamLookupTest(unittest.TestCase):
+    def setUp(self):
+        _lookup_team_id.cache_clear()
+        self.addCleanup(_lookup_team_id.cache_clear)
+
+    def assert_cases(self):
+        for name, team_id in CASES.items():
+            with self.subTest(name=name):
+                self.assertEqual(_lookup_team_id(name), team_id)
+
+    @unittest.skipIf(match_service._TEAM_AUTOMATON is None, "pyahocorasick not installed")
+    def test_partial_names_with_automaton(self):
+        self.assert_cases()
+
+    def test_partial_names_without_automaton(self):
+        with mock.patch.object(match_service, "_TEAM_AUTOMATON", None):
+            self.assert_cases()
+
+    def test_unknown_name(self):
+        self.assertIsNone(_lookup_team_id("not a club"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,13 @@
+# Production entry point: gunicorn -k geventwebsocket.gunicorn.workers.GeventWebSocketWorker wsgi:app
+from gevent import monkey
+monkey.patch_all()
+
+try:
+    # psycopg2 is a C extension the monkey patch cannot reach; make its
+    # socket waits yield to other greenlets when running on PostgreSQL.
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
+except ImportError:
+    pass
+
+from app import app, socketio  # noqa: E402,F401
@@ -5,6 +5,7 @@ import { messageAPI, communityAPI, matchAPI, stickerAPI } from '../services/api'
 import { SOCKET_URL } from '../config';
 import { useToast } from '../contexts/ToastContext';
 import { formatTime } from '../utils/formatters';
+import { inflateMsgpack } from '../utils/compression';
 import { motion, AnimatePresence } from 'framer-motion';
 import AppHeader from './AppHeader';
 import ClubNews from './ClubNews';
@@ -235,8 +236,14 @@ const CommunityRoom = () => {
 
     newSocket.on('disconnect', () => setIsConnected(false));
 
-    newSocket.on('receive_message', (data) => {
-      setMessages((prev) => [...prev, data]);
+    // Messages arrive in per-room batches, compressed once on the server.
+    // Chain the inflates so batches are appended in the order they arrived.
+    let inflateChain = Promise.resolve();
+    newSocket.on('receive_messages_z', (frame) => {
+      inflateChain = inflateChain
+        .then(() => inflateMsgpack(frame))
+        .then((batch) => setMessages((prev) => [...prev, ...batch]))
+        .catch((err) => console.error('Failed to decode message batch', err));
     });
 
     newSocket.on('goal_alert', (data) => {
@@ -352,7 +359,7 @@ const CommunityRoom = () => {
       const comm = allCommunities.find((c) => c.id === parseInt(communityId));
       setCommunity(comm);
 
-      const msgResponse = await messageAPI.getHistory(communityId, 50, 0);
+      const msgResponse = await messageAPI.getHistory(communityId, 50);
       if (msgResponse.data.success) {
         setMessages(msgResponse.data.messages);
         const pinned = msgResponse.data.messages.find(m => m.is_pinned);
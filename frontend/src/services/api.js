@@ -72,8 +72,8 @@ export const communityAPI = {
 export const messageAPI = {
   send: (communityId, content) => 
     api.post(`/communities/${communityId}/messages`, { content }),
-  getHistory: (communityId, limit = 50, offset = 0) => 
-    api.get(`/communities/${communityId}/messages`, { params: { limit, offset } }),
+  getHistory: (communityId, limit = 50, beforeId = null) => 
+    api.get(`/communities/${communityId}/messages`, { params: beforeId ? { limit, before_id: beforeId } : { limit } }),
   delete: (messageId) => api.delete(`/messages/${messageId}`),
   toggleHighlight: (messageId) => api.put(`/messages/${messageId}/highlight`),
   togglePin: (messageId) => api.put(`/messages/${messageId}/pin`),
@@ -0,0 +1,10 @@
+import { decode } from '@msgpack/msgpack';
+
+/**
+ * Inflate a zlib-compressed binary Socket.IO payload and decode it as MessagePack.
+ */
+export const inflateMsgpack = async (buffer) => {
+    const stream = new Blob([buffer]).stream().pipeThrough(new DecompressionStream('deflate'));
+    const inflated = await new Response(stream).arrayBuffer();
+    return decode(inflated);
+};